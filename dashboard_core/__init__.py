@@ -0,0 +1,62 @@
+"""Shared data and aggregation layer for the UF and Loca Loka dashboards."""
+
+from dashboard_core.aggregations import (
+    GRAINS,
+    KPI_NAMES,
+    kpi_deltas,
+    kpi_summaries,
+    kpi_summary,
+    month_labels,
+    monthly_order_view,
+    monthly_sales_by,
+    order_view,
+    sales_by,
+)
+from dashboard_core.buckets import BucketCounter, range_labels
+from dashboard_core.cache import SharedStore, TieredCache, default_shared_store
+from dashboard_core.cube import RollupCube
+from dashboard_core.dates import (
+    CUSTOM_RANGE,
+    DATE_OPTIONS,
+    DateIndex,
+    in_intervals,
+    merge_intervals,
+    parse_timestamps,
+    previous_period,
+    resolve_date_ranges,
+    shift_intervals,
+    split_months,
+)
+from dashboard_core.downsample import downsample, lttb, minmax
+from dashboard_core.engine import (
+    SELECT_ALL,
+    AggregationEngine,
+    BoundedCache,
+    FilterKey,
+    make_filter_key,
+    normalize_selection,
+)
+from dashboard_core.formatting import blank_non_positive, format_compact, format_delta, style_numbers
+from dashboard_core.lifecycle import customer_lifecycle, lifecycle_kpis, purchases
+from dashboard_core.periods import (
+    COMPARISONS,
+    PREVIOUS_PERIOD,
+    SAME_PERIOD_LAST_YEAR,
+    comparison_window,
+    period_labels,
+    same_period_last_year,
+)
+from dashboard_core.pivot import RollingWindow, SparsePivot
+from dashboard_core.refresh import IncrementalFeed, after_high_water_mark
+from dashboard_core.schema import Dictionary, compact, dictionary, downcast_integers
+from dashboard_core.store import (
+    CUSTOMER_CATEGORIES,
+    DIMENSIONS,
+    PRODUCT_CATEGORIES,
+    WAREHOUSES,
+    append_order_lines,
+    coerce_schema,
+    load_order_lines,
+    sample_order_lines,
+)
+from dashboard_core.topn import RunningTopK, top_n
@@ -0,0 +1,96 @@
+"""Vectorized KPI and chart aggregations over the order-line store."""
+
+import numpy as np
+import pandas as pd
+
+# Time-series grains offered for the line charts, as NumPy datetime units
+GRAINS = {"Monthly": "M", "Daily": "D", "Hourly": "h"}
+
+# Keys of the KPI summaries, in card order
+KPI_NAMES = ("total_sales", "avg_sales_per_customer", "avg_sales_per_order", "orders", "bottles", "customers")
+
+
+def month_labels(ts: pd.Series) -> np.ndarray:
+    """Map timestamps to ``YYYY-MM`` month labels."""
+    return np.datetime_as_string(ts.to_numpy().astype("datetime64[M]"), unit="M")
+
+
+def kpi_summaries(df: pd.DataFrame, periods: np.ndarray, n_periods: int) -> list[dict]:
+    """KPI card numbers for each period label in ``periods``, in one pass.
+
+    ``periods`` gives each row's period number in ``[0, n_periods)``.
+    """
+    sales = np.bincount(periods, weights=df["sales"].to_numpy(dtype=float), minlength=n_periods)
+    bottles = np.bincount(periods, weights=df["quantity"].to_numpy(dtype=float), minlength=n_periods)
+    distinct = {}
+    for column in ("order_id", "customer_id"):
+        pairs = pd.DataFrame({"period": periods, "id": df[column].to_numpy()}).drop_duplicates()
+        distinct[column] = np.bincount(pairs["period"].to_numpy(), minlength=n_periods)
+    summaries = []
+    for period in range(n_periods):
+        total_sales = float(sales[period])
+        orders = int(distinct["order_id"][period])
+        customers = int(distinct["customer_id"][period])
+        summaries.append({
+            "total_sales": total_sales,
+            "avg_sales_per_customer": total_sales / customers if customers else 0.0,
+            "avg_sales_per_order": total_sales / orders if orders else 0.0,
+            "orders": orders,
+            "bottles": int(bottles[period]),
+            "customers": customers,
+        })
+    return summaries
+
+
+def kpi_summary(df: pd.DataFrame) -> dict:
+    """Headline numbers shown on the KPI cards."""
+    return kpi_summaries(df, np.zeros(len(df), dtype=np.int64), 1)[0]
+
+
+def kpi_deltas(current: dict, prior: dict) -> dict:
+    """Percent change of each KPI against ``prior``; ``None`` where prior is zero."""
+    return {
+        name: 100.0 * (value - prior[name]) / prior[name] if prior[name] else None
+        for name, value in current.items()
+    }
+
+
+def sales_by(df: pd.DataFrame, dimension: str) -> pd.DataFrame:
+    """Sales and line count per value of ``dimension``, largest first."""
+    grouped = df.groupby(dimension, observed=True).agg(
+        Sales=("sales", "sum"), Count=("order_id", "size")
+    )
+    return grouped.sort_values("Sales", ascending=False)
+
+
+def monthly_sales_by(df: pd.DataFrame, dimension: str) -> pd.DataFrame:
+    """Month x ``dimension`` sales pivot, one column per category."""
+    # Grouped on datetime64[M] keys; only the grouped months are formatted
+    months = pd.DatetimeIndex(df["order_ts"].to_numpy().astype("datetime64[M]"))
+    pivot = df.groupby([months, dimension], observed=True)["sales"].sum().unstack(dimension, fill_value=0.0)
+    pivot.index = month_labels(pivot.index.to_series())
+    pivot.columns = pivot.columns.astype(str)
+    return pivot
+
+
+def order_view(df: pd.DataFrame, grain: str = "D") -> pd.DataFrame:
+    """Orders, customers and average values per ``grain`` ("M", "D" or "h") bucket.
+
+    The index holds the bucket start timestamps.
+    """
+    buckets = pd.DatetimeIndex(df["order_ts"].to_numpy().astype(f"datetime64[{grain}]"), name="period")
+    grouped = df.groupby(buckets).agg(
+        sales=("sales", "sum"),
+        orders=("order_id", "nunique"),
+        customers=("customer_id", "nunique"),
+    )
+    grouped["avg_order_value"] = grouped["sales"] / grouped["orders"]
+    grouped["avg_sales_per_customer"] = grouped["sales"] / grouped["customers"]
+    return grouped
+
+
+def monthly_order_view(df: pd.DataFrame) -> pd.DataFrame:
+    """Orders, customers and average values per month, indexed by ``YYYY-MM``."""
+    view = order_view(df, "M")
+    view.index = month_labels(view.index.to_series())
+    return view
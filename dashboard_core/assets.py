@@ -0,0 +1,109 @@
+"""Offline-tolerant Lottie animation loader.
+
+Animations are looked up in process memory, then in an on-disk cache.
+On a miss the download runs in a background thread with a timeout and the
+bundled local animation is returned straight away, so page reruns never
+wait on the network; the downloaded animation is picked up by a later
+rerun.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import requests
+
+# Directory for downloaded animations; override with UF_ASSET_CACHE
+ASSET_CACHE_ENV = "UF_ASSET_CACHE"
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "uf-dashboard" / "lottie"
+
+FALLBACK_ANIMATION = Path(__file__).parent / "static" / "data_animation.json"
+
+FETCH_TIMEOUT = 5.0
+# Seconds to wait before retrying a download that failed
+RETRY_AFTER = 300.0
+
+_memory = {}
+_pending = set()
+_failed = {}
+_lock = threading.Lock()
+
+
+def _cache_dir() -> Path:
+    return Path(os.environ.get(ASSET_CACHE_ENV, DEFAULT_CACHE_DIR))
+
+
+def _cache_path(url: str) -> Path:
+    return _cache_dir() / f"{hashlib.sha1(url.encode()).hexdigest()}.json"
+
+
+def _read_json(path: Path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: Path, data):
+    """Write ``data`` next to ``path`` and rename it into place."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _fetch(url: str, timeout: float):
+    data = None
+    try:
+        r = requests.get(url, timeout=timeout)
+        if r.status_code == 200:
+            data = r.json()
+    except (requests.RequestException, ValueError):
+        pass
+
+    with _lock:
+        _pending.discard(url)
+        if data is None:
+            _failed[url] = time.monotonic()
+            return
+        _memory[url] = data
+        _failed.pop(url, None)
+    try:
+        _write_json(_cache_path(url), data)
+    except OSError:
+        pass
+
+
+@lru_cache(maxsize=1)
+def fallback_animation():
+    """The animation bundled with the package."""
+    return _read_json(FALLBACK_ANIMATION)
+
+
+def load_lottie(url: str, timeout: float = FETCH_TIMEOUT):
+    """Return the Lottie JSON for ``url`` without blocking on the network."""
+    with _lock:
+        if url in _memory:
+            return _memory[url]
+
+    data = _read_json(_cache_path(url))
+    if data is not None:
+        with _lock:
+            _memory[url] = data
+        return data
+
+    with _lock:
+        failed_at = _failed.get(url)
+        start = url not in _pending and (failed_at is None or time.monotonic() - failed_at > RETRY_AFTER)
+        if start:
+            _pending.add(url)
+    if start:
+        threading.Thread(target=_fetch, args=(url, timeout), daemon=True).start()
+    return fallback_animation()
@@ -0,0 +1,77 @@
+"""Histogram bucketing of keyed values with incremental counts.
+
+A :class:`BucketCounter` remembers the current bin of every key. Updating
+a batch of keys re-bins just those keys with ``np.digitize`` and moves
+their counts between bins, so the per-bin totals never need a full
+recount. Members of a bin are looked up on demand, one page at a time,
+instead of being joined into display strings up front.
+"""
+
+import numpy as np
+import pandas as pd
+
+PAGE_SIZE = 25
+
+
+def range_labels(edges: list) -> list[str]:
+    """Labels for integer bins starting at ``edges``: '1', '7-12', ..., '>24'."""
+    labels = []
+    for low, high in zip(edges, edges[1:]):
+        labels.append(str(low) if high - low == 1 else f"{low}-{high - 1}")
+    labels.append(f">{edges[-1] - 1}")
+    return labels
+
+
+class BucketCounter:
+    """Per-bin key counts for values binned at ``edges``.
+
+    Bin ``i`` holds values in ``[edges[i], edges[i + 1])``; the last bin is
+    open ended. Values below ``edges[0]`` are tracked but not counted.
+    """
+
+    def __init__(self, edges: list, labels: list[str] | None = None):
+        self.edges = np.asarray(edges, dtype=float)
+        self.labels = list(labels) if labels is not None else range_labels(list(edges))
+        if len(self.labels) != len(self.edges):
+            raise ValueError("Need one label per bin edge")
+        self.keys = pd.Index([])
+        self.bins = np.empty(0, dtype=np.int64)
+        self.counts = np.zeros(len(self.edges), dtype=np.int64)
+
+    def assign(self, values) -> np.ndarray:
+        """Bin number of each value, or -1 below the first edge."""
+        return np.digitize(np.asarray(values, dtype=float), self.edges) - 1
+
+    def _positions(self, keys: pd.Index) -> np.ndarray:
+        positions = self.keys.get_indexer(keys)
+        new = positions == -1
+        if new.any():
+            positions[new] = len(self.keys) + np.arange(new.sum())
+            self.keys = self.keys.append(keys[new])
+            self.bins = np.concatenate([self.bins, np.full(new.sum(), -1)])
+        return positions
+
+    def update(self, keys, values):
+        """Set the current value of each of ``keys`` (unique) and adjust the counts."""
+        keys = pd.Index(keys)
+        positions = self._positions(keys)
+        old = self.bins[positions]
+        new = self.assign(values)
+        n_bins = len(self.edges)
+        self.counts -= np.bincount(old[old >= 0], minlength=n_bins)
+        self.counts += np.bincount(new[new >= 0], minlength=n_bins)
+        self.bins[positions] = new
+
+    def table(self, drop_empty: bool = True) -> pd.DataFrame:
+        """Label and key count per bin."""
+        frame = pd.DataFrame({"bin": self.labels, "count": self.counts})
+        return frame[frame["count"] > 0].reset_index(drop=True) if drop_empty else frame
+
+    def members(self, label: str, page: int = 0, page_size: int = PAGE_SIZE) -> list:
+        """One page of the keys in bin ``label``, in sorted order."""
+        keys = self.keys[self.bins == self.labels.index(label)].sort_values()
+        return keys[page * page_size:(page + 1) * page_size].tolist()
+
+    def pages(self, label: str, page_size: int = PAGE_SIZE) -> int:
+        """Number of member pages in bin ``label``."""
+        return max(1, -(-int(self.counts[self.labels.index(label)]) // page_size))
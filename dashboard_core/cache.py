@@ -0,0 +1,282 @@
+"""Caches and content keys shared by the dashboard engines, grids and figure builders.
+
+:class:`BoundedCache` is the in-process tier, bounded by entry count and
+by bytes. :class:`SharedStore` is a second tier on local disk that every
+Streamlit worker process on the host reads and writes: aggregates are
+stored as uncompressed Feather files and read back memory-mapped, so a
+worker reuses what another one computed and a restarted worker warms up
+from disk instead of recomputing. :class:`TieredCache` puts the two
+together behind content-hash keys, which stay valid across processes.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Environment variable naming the shared cache directory; "off" disables it
+SHARED_CACHE_ENV = "DASHBOARD_CACHE_DIR"
+DEFAULT_SHARED_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "uf-dashboard", "shared")
+
+# Part of every SharedStore entry name. Content keys only cover the inputs,
+# so bump this whenever the code that computes shared values, or their
+# on-disk encoding, changes; entries of older versions are never read again
+# and age out of the store.
+CACHE_VERSION = 2
+
+
+def _update_digest(digest, value):
+    """Feed a content fingerprint of ``value`` into ``digest``."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(repr(value.columns.tolist() if isinstance(value, pd.DataFrame) else value.name).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Index):
+        digest.update(pd.util.hash_pandas_object(value).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(f"{value.dtype}{value.shape}".encode())
+        digest.update(np.ascontiguousarray(value).tobytes() if value.dtype != object else repr(value.tolist()).encode())
+    else:
+        digest.update(json.dumps(value, sort_keys=True, default=str).encode())
+
+
+def content_key(name: str, *args, **kwargs) -> str:
+    """Hash of ``name`` and the contents of its positional and keyword arguments."""
+    digest = hashlib.sha1(name.encode())
+    for value in args:
+        _update_digest(digest, value)
+    for key in sorted(kwargs):
+        digest.update(key.encode())
+        _update_digest(digest, kwargs[key])
+    return digest.hexdigest()
+
+
+def sizeof(value) -> int:
+    """Approximate bytes held by ``value``, including the strings of object columns."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(key) + sizeof(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sizeof(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class BoundedCache:
+    """Least-recently-used cache with an entry limit, a byte budget and a time-to-live.
+
+    ``max_bytes`` bounds the summed :func:`sizeof` of the cached values;
+    ``None`` leaves only the entry limit. Safe to share between the
+    threads Streamlit runs sessions on.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl: float | None = 600.0, max_bytes: int | None = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self, key):
+        _, _, size = self._entries.pop(key)
+        self.nbytes -= size
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            stored_at, value, _ = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                self._evict(key)
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        size = sizeof(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+            self._entries[key] = (time.monotonic(), value, size)
+            self.nbytes += size
+            while len(self._entries) > self.max_entries or (self.max_bytes is not None and self.nbytes > self.max_bytes):
+                self._evict(next(iter(self._entries)))
+
+    def get_or_compute(self, key, compute: Callable):
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+def _encode(value, directory: str, files: list):
+    """JSON-able description of ``value``; frames and series are written beside it as Feather files."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        name = f"{len(files)}.feather"
+        frame = value.to_frame(name="values") if isinstance(value, pd.Series) else value
+        feather.write_feather(pa.Table.from_pandas(frame, preserve_index=True),
+                              os.path.join(directory, name), compression="uncompressed")
+        files.append(name)
+        if isinstance(value, pd.Series):
+            return {"series": name, "name": value.name}
+        return {"frame": name}
+    if isinstance(value, dict):
+        return {"dict": [[key, _encode(item, directory, files)] for key, item in value.items()]}
+    if isinstance(value, (list, tuple)):
+        return {"list": [_encode(item, directory, files) for item in value]}
+    if isinstance(value, np.generic):
+        value = value.item()
+    return {"value": value}
+
+
+def _decode(node: dict, directory: str):
+    if "frame" in node or "series" in node:
+        table = feather.read_table(os.path.join(directory, node.get("frame") or node["series"]), memory_map=True)
+        frame = table.to_pandas()
+        return frame if "frame" in node else frame["values"].rename(node["name"])
+    if "dict" in node:
+        return {key: _decode(item, directory) for key, item in node["dict"]}
+    if "list" in node:
+        return [_decode(item, directory) for item in node["list"]]
+    return node["value"]
+
+
+class SharedStore:
+    """Cached values in a local directory shared by every worker process on the host.
+
+    Each entry is a directory named by a hash of its key, holding a JSON
+    manifest and one Feather file per frame or series in the value.
+    Entries are written under a temporary name and renamed into place, so
+    readers never see a partial entry and concurrent writers of one key
+    leave a single complete copy. Keys must be content keys: an entry is
+    never invalidated, only removed, least recently read first, once the
+    store passes ``max_bytes``; :data:`CACHE_VERSION` retires the entries
+    of older code.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 1 << 30):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(f"{CACHE_VERSION}:{key}".encode()).hexdigest())
+
+    def get(self, key: str, default=None):
+        path = self._path(key)
+        try:
+            with open(os.path.join(path, "manifest.json")) as handle:
+                manifest = json.load(handle)
+            value = _decode(manifest, path)
+            os.utime(path)
+        except (OSError, ValueError, pa.ArrowException):
+            # Missing, or removed by another worker while being read
+            return default
+        return value
+
+    def put(self, key: str, value):
+        path = self._path(key)
+        if os.path.isdir(path):
+            return
+        staging = os.path.join(self.directory, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(staging)
+        try:
+            manifest = _encode(value, staging, [])
+            with open(os.path.join(staging, "manifest.json"), "w") as handle:
+                json.dump(manifest, handle, default=str)
+            os.rename(staging, path)
+        except OSError:
+            # Another worker renamed its copy into place first
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+        self._prune()
+
+    def _prune(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            try:
+                size = sum(item.stat().st_size for item in os.scandir(entry.path))
+                entries.append((entry.stat().st_mtime, size, entry.path))
+            except OSError:
+                continue
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
+
+
+def default_shared_store() -> SharedStore | None:
+    """The host-wide store under :data:`SHARED_CACHE_ENV` (or the user's cache directory); ``None`` when off."""
+    directory = os.environ.get(SHARED_CACHE_ENV, DEFAULT_SHARED_CACHE_DIR)
+    if directory.lower() == "off":
+        return None
+    try:
+        return SharedStore(directory)
+    except OSError:
+        return None
+
+
+class TieredCache:
+    """An in-process :class:`BoundedCache` in front of an optional :class:`SharedStore`.
+
+    Keys must be strings that identify the content, such as
+    :func:`content_key` digests, because other processes read them.
+    """
+
+    def __init__(self, memory: BoundedCache, shared: SharedStore | None = None):
+        self.memory = memory
+        self.shared = shared
+
+    def get_or_compute(self, key: str, compute: Callable):
+        missing = object()
+        value = self.memory.get(key, missing)
+        if value is not missing:
+            return value
+        if self.shared is not None:
+            value = self.shared.get(key, missing)
+        if value is missing:
+            value = compute()
+            if self.shared is not None:
+                self.shared.put(key, value)
+        self.memory.put(key, value)
+        return value
+
+    def clear(self):
+        """Drop the in-process tier; shared entries are keyed by content and stay valid."""
+        self.memory.clear()
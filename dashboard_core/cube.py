@@ -0,0 +1,141 @@
+"""Materialized month x dimension rollup cube.
+
+The cube holds additive measures (sales, bottles, order lines) in dense
+NumPy arrays indexed by month and by the category codes of every
+dimension. It is built with one ``bincount`` over the order lines and
+kept current by folding in new lines, so charts are answered by slicing
+cells instead of scanning rows. Distinct counts (orders, customers) are
+not additive across cells and still come from the order lines.
+"""
+
+import numpy as np
+import pandas as pd
+
+from dashboard_core.store import DIMENSIONS
+
+MEASURES = ("sales", "quantity", "lines")
+
+
+def month_ordinals(ts: pd.Series) -> np.ndarray:
+    """Months since 1970-01 for each timestamp."""
+    return ts.to_numpy().astype("datetime64[M]").astype(np.int64)
+
+
+class RollupCube:
+    """Sales, bottles and line counts by month x product x customer x warehouse."""
+
+    def __init__(self, dimensions=DIMENSIONS):
+        self.dimensions = list(dimensions)
+        self.categories = {dimension: pd.Index([], dtype=object) for dimension in self.dimensions}
+        self.first_month = None
+        self.cells = {measure: np.zeros((0,) * (len(self.dimensions) + 1)) for measure in MEASURES}
+
+    @classmethod
+    def from_order_lines(cls, order_lines: pd.DataFrame, dimensions=DIMENSIONS) -> "RollupCube":
+        cube = cls(dimensions)
+        cube.append(order_lines)
+        return cube
+
+    @property
+    def shape(self) -> tuple:
+        return self.cells["sales"].shape
+
+    @property
+    def months(self) -> np.ndarray:
+        """``YYYY-MM`` label of every month along the first axis."""
+        if self.first_month is None:
+            return np.array([], dtype=str)
+        ordinals = np.arange(self.first_month, self.first_month + self.shape[0])
+        return np.datetime_as_string(ordinals.astype("datetime64[M]"), unit="M")
+
+    def _grow(self, first_month: int, last_month: int, categories: dict):
+        """Pad the cell arrays to cover new months and new categories."""
+        if self.first_month is None:
+            self.first_month = first_month
+        before = max(self.first_month - first_month, 0)
+        after = max(last_month - (self.first_month + self.shape[0] - 1), 0)
+        padding = [(before, after)]
+        for dimension in self.dimensions:
+            padding.append((0, len(categories[dimension]) - len(self.categories[dimension])))
+        if any(pad != (0, 0) for pad in padding):
+            for measure in MEASURES:
+                self.cells[measure] = np.pad(self.cells[measure], padding)
+        self.first_month -= before
+        self.categories = categories
+
+    def append(self, order_lines: pd.DataFrame):
+        """Fold new order lines into the cube in place."""
+        if order_lines.empty:
+            return
+        months = month_ordinals(order_lines["order_ts"])
+
+        # Extend the category dictionaries; existing codes keep their position
+        categories = {}
+        codes = []
+        for dimension in self.dimensions:
+            column = order_lines[dimension].astype("category")
+            known = self.categories[dimension]
+            categories[dimension] = known.append(column.cat.categories.difference(known, sort=False))
+            codes.append(categories[dimension].get_indexer(column.cat.categories)[column.cat.codes.to_numpy()])
+
+        self._grow(int(months.min()), int(months.max()), categories)
+        for measure in MEASURES:
+            if not self.cells[measure].flags.writeable:
+                # Cells mapped from a snapshot are read-only until first written
+                self.cells[measure] = self.cells[measure].copy()
+
+        shape = self.shape
+        flat = np.ravel_multi_index([months - self.first_month] + codes, shape)
+        size = int(np.prod(shape))
+        self.cells["sales"] += np.bincount(flat, weights=order_lines["sales"].to_numpy(), minlength=size).reshape(shape)
+        self.cells["quantity"] += np.bincount(flat, weights=order_lines["quantity"].to_numpy(), minlength=size).reshape(shape)
+        self.cells["lines"] += np.bincount(flat, minlength=size).reshape(shape)
+
+    def _selector(self, key, months=None) -> tuple:
+        """Index arrays selecting the filtered slice of every axis."""
+        if months is None or self.first_month is None:
+            selector = [np.arange(self.shape[0])]
+        else:
+            positions = np.asarray(months, dtype=np.int64) - self.first_month
+            selector = [positions[(positions >= 0) & (positions < self.shape[0])]]
+        for dimension in self.dimensions:
+            values = getattr(key, dimension, None) if key is not None else None
+            if values is None:
+                selector.append(np.arange(len(self.categories[dimension])))
+            else:
+                codes = self.categories[dimension].get_indexer(list(values))
+                selector.append(codes[codes >= 0])
+        return tuple(selector)
+
+    def slice(self, measure: str, key=None, months=None) -> np.ndarray:
+        """Sub-cube of ``measure`` restricted to ``key`` and optional month ordinals."""
+        return self.cells[measure][np.ix_(*self._selector(key, months))]
+
+    def by(self, dimension: str, key=None, months=None) -> pd.DataFrame:
+        """Sales and line count per category of ``dimension``, largest first."""
+        selector = self._selector(key, months)
+        axis = self.dimensions.index(dimension) + 1
+        other_axes = tuple(i for i in range(len(selector)) if i != axis)
+        sales = self.slice("sales", key, months).sum(axis=other_axes)
+        lines = self.slice("lines", key, months).sum(axis=other_axes)
+        observed = lines > 0
+        frame = pd.DataFrame(
+            {"Sales": sales[observed], "Count": lines[observed].astype(np.int64)},
+            index=pd.Index(self.categories[dimension][selector[axis]][observed], name=dimension),
+        )
+        return frame.sort_values("Sales", ascending=False)
+
+    def by_month(self, dimension: str, key=None, months=None) -> pd.DataFrame:
+        """Month x ``dimension`` sales pivot over observed months and categories."""
+        selector = self._selector(key, months)
+        axis = self.dimensions.index(dimension) + 1
+        other_axes = tuple(i for i in range(1, len(selector)) if i != axis)
+        sales = self.slice("sales", key, months).sum(axis=other_axes)
+        lines = self.slice("lines", key, months).sum(axis=other_axes)
+        rows = lines.any(axis=1)
+        cols = lines.any(axis=0)
+        return pd.DataFrame(
+            sales[np.ix_(rows, cols)],
+            index=self.months[selector[0]][rows],
+            columns=self.categories[dimension][selector[axis]][cols].astype(str),
+        )
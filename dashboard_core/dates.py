@@ -0,0 +1,189 @@
+"""Relative date-range resolution and a sorted calendar index.
+
+The Date Range multiselect resolves to merged, half-open ``[start, end)``
+day intervals. Because the order-line store is sorted by timestamp, a
+:class:`DateIndex` of day offsets turns each interval into a contiguous
+row span with two binary searches instead of a boolean mask over every
+row.
+
+Text dates are normalized once, at ingestion: :func:`parse_timestamps`
+parses each distinct string a single time with an explicit format,
+trying the format that last matched first, so later grouping, sorting
+and recency work on ``datetime64`` columns instead of re-reading strings.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+CUSTOM_RANGE = "Custom Range"
+
+# Number of whole days before today covered by each "Past N days" option;
+# like "Yesterday", these windows end at the start of today
+PAST_DAYS = {
+    "Past 7 days": 7,
+    "Past 14 days": 14,
+    "Past 30 days": 30,
+    "Past 90 days": 90,
+}
+
+DATE_OPTIONS = ["Today", "Yesterday", *PAST_DAYS, CUSTOM_RANGE]
+
+# Timestamp formats seen in exports, e.g. "May 3, 2025, 5:49 AM" and "Sep 30, 2025"
+TIMESTAMP_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d",
+    "%b %d, %Y, %I:%M %p",
+    "%b %d, %Y",
+    "%d/%m/%Y",
+)
+
+# Formats that matched most recently, per format list, tried first next time
+_format_order = {}
+
+
+def _parse_unique(text: pd.Series, formats: tuple) -> pd.Series:
+    """Parse distinct strings with the first of ``formats`` that matches each."""
+    order = _format_order.get(formats, list(formats))
+    parsed = pd.Series(pd.NaT, index=text.index, dtype="datetime64[ns]")
+    pending = text.notna()
+    matched = []
+    for fmt in order:
+        if not pending.any():
+            break
+        attempt = pd.to_datetime(text[pending], format=fmt, errors="coerce")
+        hit = attempt.notna()
+        if hit.any():
+            parsed[attempt.index[hit]] = attempt[hit]
+            pending[attempt.index[hit]] = False
+            matched.append(fmt)
+    _format_order[formats] = matched + [fmt for fmt in order if fmt not in matched]
+    if pending.any():
+        parsed[pending] = pd.to_datetime(text[pending], format="mixed", errors="coerce")
+    return parsed
+
+
+def parse_timestamps(values, formats: tuple = TIMESTAMP_FORMATS) -> pd.Series:
+    """``datetime64[ns]`` timestamps from text, each distinct string parsed once.
+
+    Values that are already timestamps are returned as they are. Strings
+    that match none of ``formats`` are tried with pandas' mixed-format
+    parser and become ``NaT`` when that fails too.
+    """
+    values = pd.Series(values)
+    if values.dtype.kind == "M":
+        return values
+    codes, uniques = pd.factorize(values.astype(object).str.strip())
+    parsed = _parse_unique(pd.Series(uniques, dtype=object), formats).to_numpy()
+    result = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[ns]")
+    result[codes >= 0] = parsed[codes[codes >= 0]]
+    return pd.Series(result, index=values.index, name=values.name)
+
+
+def merge_intervals(intervals) -> tuple:
+    """Sort half-open intervals and coalesce overlapping or touching ones."""
+    merged = []
+    for start, end in sorted(interval for interval in intervals if interval[0] < interval[1]):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return tuple(merged)
+
+
+def resolve_date_ranges(selected, today: date | None = None, custom: tuple | None = None) -> tuple | None:
+    """Turn Date Range selections into merged ``(start, end)`` date intervals.
+
+    ``custom`` is the inclusive ``(first_day, last_day)`` picked for "Custom
+    Range". Returns ``None`` when nothing is selected, meaning all dates.
+    """
+    if not selected:
+        return None
+    today = today or date.today()
+    intervals = []
+    for option in selected:
+        if option == "Today":
+            intervals.append((today, today + timedelta(days=1)))
+        elif option == "Yesterday":
+            intervals.append((today - timedelta(days=1), today))
+        elif option in PAST_DAYS:
+            intervals.append((today - timedelta(days=PAST_DAYS[option]), today))
+        elif option == CUSTOM_RANGE and custom:
+            first_day, last_day = custom[0], custom[-1]
+            intervals.append((first_day, last_day + timedelta(days=1)))
+    return merge_intervals(intervals)
+
+
+def shift_intervals(intervals, days: int) -> tuple:
+    """The same intervals moved ``days`` days later (earlier when negative)."""
+    step = timedelta(days=days)
+    return tuple((start + step, end + step) for start, end in intervals)
+
+
+def previous_period(intervals) -> tuple:
+    """The intervals moved back by the length of the window they span.
+
+    The result ends where the current window starts, so "Past 7 days" is
+    compared with the seven days before it and "Today" with yesterday.
+    """
+    if not intervals:
+        return ()
+    span = (intervals[-1][1] - intervals[0][0]).days
+    return shift_intervals(intervals, -span)
+
+
+def in_intervals(day_offsets: np.ndarray, bounds: np.ndarray) -> np.ndarray:
+    """Whether each day offset falls inside one of the sorted ``[start, end)`` bounds."""
+    return np.searchsorted(bounds.ravel(), day_offsets, side="right") % 2 == 1
+
+
+def split_months(intervals) -> tuple[list, list]:
+    """Split day intervals into whole calendar months and leftover edge intervals.
+
+    Returns ``(months, edges)`` where ``months`` holds month ordinals (months
+    since 1970-01) fully covered by an interval.
+    """
+    months, edges = [], []
+    for start, end in intervals:
+        start_day, end_day = np.datetime64(start, "D"), np.datetime64(end, "D")
+        first_month = start_day.astype("datetime64[M]")
+        if first_month.astype("datetime64[D]") < start_day:
+            first_month += 1
+        last_month = end_day.astype("datetime64[M]")
+        if first_month >= last_month:
+            edges.append((start, end))
+            continue
+        months.extend(range(first_month.astype(np.int64), last_month.astype(np.int64)))
+        month_start = first_month.astype("datetime64[D]").astype(date)
+        month_end = last_month.astype("datetime64[D]").astype(date)
+        if start < month_start:
+            edges.append((start, month_start))
+        if month_end < end:
+            edges.append((month_end, end))
+    return months, edges
+
+
+class DateIndex:
+    """Day offsets of a timestamp-sorted column, searchable by date interval."""
+
+    def __init__(self, timestamps: pd.Series):
+        days = timestamps.to_numpy().astype("datetime64[D]")
+        self.origin = days[0] if len(days) else np.datetime64("1970-01-01", "D")
+        self.day_offsets = (days - self.origin).astype(np.int32)
+
+    def _offset(self, day: date) -> int:
+        return int((np.datetime64(day, "D") - self.origin).astype(np.int64))
+
+    def bounds(self, intervals) -> np.ndarray:
+        """``(n, 2)`` day-offset bounds of ``intervals``."""
+        return np.array([[self._offset(start), self._offset(end)] for start, end in intervals],
+                        dtype=np.int64).reshape(-1, 2)
+
+    def spans(self, intervals) -> list[tuple[int, int]]:
+        """Row ``(lo, hi)`` positions covered by each non-empty interval."""
+        bounds = self.bounds(intervals)
+        if not len(bounds):
+            return []
+        positions = np.searchsorted(self.day_offsets, bounds.ravel(), side="left").reshape(-1, 2)
+        return [(int(lo), int(hi)) for lo, hi in positions if lo < hi]
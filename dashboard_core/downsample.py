@@ -0,0 +1,73 @@
+"""Server-side downsampling of long time series for line charts.
+
+A chart a few hundred pixels wide cannot show more than a couple of
+points per pixel, so sending every daily or hourly point only costs
+payload and render time. :func:`lttb` keeps the points that preserve the
+visual shape (largest-triangle-three-buckets); :func:`minmax` keeps each
+bucket's extremes so spikes survive. :func:`downsample` sizes the output
+from the chart's pixel width, so the payload stays bounded for any span.
+"""
+
+import numpy as np
+
+# Default chart width when the real width is not known (half-width column)
+CHART_WIDTH_PX = 600
+
+LTTB = "lttb"
+MINMAX = "minmax"
+
+
+def _as_float(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x)
+    return x.astype("datetime64[ns]").astype(np.int64).astype(float) if x.dtype.kind == "M" else x.astype(float)
+
+
+def lttb(x, y, threshold: int) -> np.ndarray:
+    """Positions of the ``threshold`` points LTTB keeps, first and last included."""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = _as_float(x)
+
+    # threshold - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    anchor = 0
+    for bucket in range(threshold - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        next_lo, next_hi = (hi, edges[bucket + 2]) if bucket + 2 < len(edges) else (n - 1, n)
+        next_x, next_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        # Twice the area of the triangle (anchor, candidate, next bucket average)
+        area = np.abs((x[anchor] - next_x) * (y[lo:hi] - y[anchor]) - (x[anchor] - x[lo:hi]) * (next_y - y[anchor]))
+        anchor = lo + int(np.argmax(area)) if hi > lo else lo
+        selected[bucket + 1] = anchor
+    return np.unique(selected)
+
+
+def minmax(y, buckets: int) -> np.ndarray:
+    """Positions of the minimum and maximum of each of ``buckets`` equal slices."""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if 2 * buckets >= n:
+        return np.arange(n)
+    edges = np.unique(np.linspace(0, n, buckets + 1).astype(np.int64))
+    bucket = np.repeat(np.arange(len(edges) - 1), np.diff(edges))
+    # Sorting by (bucket, value) puts each bucket's min first and max last
+    order = np.lexsort((y, bucket))
+    return np.unique(np.concatenate([order[edges[:-1]], order[edges[1:] - 1], [0, n - 1]]))
+
+
+def downsample(x, y, width_px: int = CHART_WIDTH_PX, method: str = LTTB,
+               points_per_px: float = 1.0) -> tuple[np.ndarray, np.ndarray]:
+    """``(x, y)`` reduced to about ``width_px * points_per_px`` points."""
+    x, y = np.asarray(x), np.asarray(y)
+    threshold = max(3, int(width_px * points_per_px))
+    if method == MINMAX:
+        keep = minmax(y, threshold // 2)
+    elif method == LTTB:
+        keep = lttb(x, y, threshold)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method!r}")
+    return x[keep], y[keep]
@@ -0,0 +1,220 @@
+"""Filter-keyed aggregation engine for the dashboard multiselects.
+
+Widget selections are normalized into a hashable :class:`FilterKey` where
+"Select All" (or an empty selection) collapses to a ``None`` wildcard, so
+equivalent selections share cache entries. Each dimension's row mask is
+cached on its own: changing one multiselect only recomputes that
+dimension's mask and reuses the others. Date intervals are answered
+with a :class:`DateIndex` as contiguous row spans. Category breakdowns are
+sliced from a :class:`RollupCube` built once when the engine is created;
+only the partial months at the edges of a date filter are read from rows.
+Summaries and series are cached under a content hash of the order lines
+and the filter, so a :class:`SharedStore` lets every worker process reuse
+them.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from dashboard_core.aggregations import (
+    KPI_NAMES,
+    kpi_deltas,
+    kpi_summaries,
+    kpi_summary,
+    monthly_order_view,
+    monthly_sales_by,
+    order_view,
+    sales_by,
+)
+from dashboard_core.cache import BoundedCache, SharedStore, TieredCache, content_key
+from dashboard_core.cube import RollupCube
+from dashboard_core.dates import DateIndex, merge_intervals, split_months
+from dashboard_core.periods import PREVIOUS_PERIOD, comparison_window, overlaps, period_labels
+from dashboard_core.store import DIMENSIONS, append_order_lines, coerce_schema
+
+SELECT_ALL = "Select All"
+
+
+class FilterKey(NamedTuple):
+    customer_category: tuple | None = None
+    warehouse: tuple | None = None
+    product_category: tuple | None = None
+    # Merged (start, end) date intervals from resolve_date_ranges
+    dates: tuple | None = None
+
+
+def normalize_selection(selected) -> tuple | None:
+    """Collapse a multiselect value into a sorted tuple, or ``None`` for all."""
+    if not selected or SELECT_ALL in selected:
+        return None
+    return tuple(sorted(set(selected)))
+
+
+def make_filter_key(customer_category=None, warehouse=None, product_category=None, dates=None) -> FilterKey:
+    return FilterKey(
+        customer_category=normalize_selection(customer_category),
+        warehouse=normalize_selection(warehouse),
+        product_category=normalize_selection(product_category),
+        dates=dates,
+    )
+
+
+def _combine_by(frame: pd.DataFrame, extra: pd.DataFrame) -> pd.DataFrame:
+    extra = extra.set_axis(extra.index.astype(object))
+    combined = pd.concat([frame, extra]).groupby(level=0, sort=False, observed=True).sum()
+    return combined.sort_values("Sales", ascending=False)
+
+
+class AggregationEngine:
+    """Answers dashboard aggregates for a :class:`FilterKey` over one store.
+
+    ``cube`` and ``version`` are passed in when the store is opened from a
+    snapshot (see :mod:`dashboard_core.snapshot`); otherwise they are
+    computed from the order lines.
+    """
+
+    def __init__(self, order_lines: pd.DataFrame, max_entries: int = 128, ttl: float | None = 600.0,
+                 max_bytes: int | None = 256 << 20, shared: SharedStore | None = None,
+                 cube: RollupCube | None = None, version: str | None = None):
+        self.order_lines = order_lines
+        # Identifies the order lines across processes: a content hash or a snapshot version
+        self.version = version or content_key("order_lines", order_lines)
+        self.date_index = DateIndex(order_lines["order_ts"])
+        self.cube = cube if cube is not None else RollupCube.from_order_lines(order_lines)
+        # Each mask is one bool per order line, so masks are held to the byte budget too
+        self._masks = BoundedCache(max_entries, ttl, max_bytes)
+        self._summaries = TieredCache(BoundedCache(max_entries, ttl, max_bytes), shared)
+        # KPIs of comparison windows, keyed by the FilterKey of the window
+        self._comparisons = BoundedCache(max_entries, ttl)
+        self._series = TieredCache(BoundedCache(max_entries, ttl, max_bytes), shared)
+
+    def append(self, new_lines: pd.DataFrame):
+        """Add newly arrived order lines and fold them into the cube."""
+        new_lines = coerce_schema(new_lines)
+        self.order_lines = append_order_lines(self.order_lines, new_lines)
+        self.version = content_key("order_lines", self.version, new_lines)
+        self.date_index = DateIndex(self.order_lines["order_ts"])
+        self.cube.append(new_lines)
+        self._masks.clear()
+        self._summaries.clear()
+        self._comparisons.clear()
+        self._series.clear()
+
+    def options(self, dimension: str) -> list:
+        """Multiselect options for ``dimension``, led by "Select All"."""
+        return [SELECT_ALL] + self.order_lines[dimension].cat.categories.astype(str).tolist()
+
+    def _dimension_mask(self, dimension: str, values: tuple) -> np.ndarray:
+        def compute():
+            column = self.order_lines[dimension]
+            wanted = column.cat.categories.get_indexer(list(values))
+            return np.isin(column.cat.codes.to_numpy(), wanted[wanted >= 0])
+
+        return self._masks.get_or_compute((dimension, values), compute)
+
+    def mask(self, key: FilterKey) -> np.ndarray | None:
+        """Combined row mask for ``key``; ``None`` when nothing is filtered."""
+        combined = None
+        for dimension in DIMENSIONS:
+            values = getattr(key, dimension)
+            if values is None:
+                continue
+            dimension_mask = self._dimension_mask(dimension, values)
+            combined = dimension_mask if combined is None else combined & dimension_mask
+        return combined
+
+    def _take(self, intervals, mask: np.ndarray | None) -> pd.DataFrame:
+        """Rows inside ``intervals`` (all rows when ``None``) that pass ``mask``."""
+        if intervals is None:
+            spans = [(0, len(self.order_lines))]
+        else:
+            spans = self.date_index.spans(intervals)
+        pieces = []
+        for lo, hi in spans:
+            piece = self.order_lines.iloc[lo:hi]
+            pieces.append(piece if mask is None else piece[mask[lo:hi]])
+        if not pieces:
+            return self.order_lines.iloc[0:0]
+        return pieces[0] if len(pieces) == 1 else pd.concat(pieces)
+
+    def rows(self, key: FilterKey) -> pd.DataFrame:
+        return self._take(key.dates, self.mask(key))
+
+    def _day_offsets(self, rows: pd.DataFrame) -> np.ndarray:
+        return (rows["order_ts"].to_numpy().astype("datetime64[D]") - self.date_index.origin).astype(np.int64)
+
+    def _period_kpis(self, key: FilterKey, comparison: str) -> tuple[pd.DataFrame, dict, dict]:
+        """Rows of ``key``'s window, its KPIs and the KPIs of its comparison window.
+
+        Both windows are read in one take and aggregated in one pass over a
+        period label column. The comparison KPIs are cached on their own, so
+        while they are warm only the current window is scanned.
+        """
+        comparison_key = key._replace(dates=comparison_window(key.dates, comparison))
+        mask = self.mask(key)
+        comparison_kpis = self._comparisons.get(comparison_key)
+        if comparison_kpis is not None or overlaps(key.dates, comparison_key.dates):
+            # A row can only carry one label, so overlapping windows are read apart
+            rows = self._take(key.dates, mask)
+            if comparison_kpis is None:
+                comparison_kpis = kpi_summary(self._take(comparison_key.dates, mask))
+                self._comparisons.put(comparison_key, comparison_kpis)
+            return rows, kpi_summary(rows), comparison_kpis
+
+        window = self._take(merge_intervals(key.dates + comparison_key.dates), mask)
+        labels = period_labels(self._day_offsets(window), [
+            self.date_index.bounds(key.dates),
+            self.date_index.bounds(comparison_key.dates),
+        ])
+        kpis, comparison_kpis = kpi_summaries(window, labels, 2)
+        self._comparisons.put(comparison_key, comparison_kpis)
+        return window[labels == 0], kpis, comparison_kpis
+
+    def _summarize(self, key: FilterKey, comparison: str) -> dict:
+        # Distinct orders and customers need the order lines themselves
+        if key.dates is not None:
+            rows, kpis, comparison_kpis = self._period_kpis(key, comparison)
+            deltas = kpi_deltas(kpis, comparison_kpis)
+        else:
+            rows = self.rows(key)
+            kpis, deltas = kpi_summary(rows), dict.fromkeys(KPI_NAMES)
+        summary = {
+            "kpis": kpis,
+            # Percent change against the comparison window
+            "kpi_deltas": deltas,
+            "order_view": monthly_order_view(rows),
+        }
+
+        # Additive breakdowns are O(cells) slices of the rollup cube; with a
+        # date filter the cube covers whole months and rows cover the edges
+        months, edge_rows = None, None
+        if key.dates is not None:
+            months, edges = split_months(key.dates)
+            edge_rows = self._take(edges, self.mask(key))
+        for dimension, name in (("customer_category", "customer"), ("product_category", "product")):
+            by = self.cube.by(dimension, key, months)
+            by_month = self.cube.by_month(dimension, key, months)
+            if edge_rows is not None and len(edge_rows):
+                by = _combine_by(by, sales_by(edge_rows, dimension))
+                # fill_value only covers cells missing on one side; months seen only in
+                # the edges and categories seen only in the cube are missing on both
+                by_month = by_month.add(monthly_sales_by(edge_rows, dimension), fill_value=0.0)
+                by_month = by_month.fillna(0.0).sort_index()
+            summary[f"{name}_sales"] = by
+            summary[f"{name}_monthly"] = by_month
+        return summary
+
+    def summary(self, key: FilterKey, comparison: str = PREVIOUS_PERIOD) -> dict:
+        """KPI and chart aggregates for the filtered order lines.
+
+        ``kpi_deltas`` compares the KPIs with the ``comparison`` window.
+        """
+        return self._summaries.get_or_compute(content_key("summary", self.version, key, comparison),
+                                              lambda: self._summarize(key, comparison))
+
+    def order_view(self, key: FilterKey, grain: str = "D") -> pd.DataFrame:
+        """Orders, customers and averages per day ("D") or hour ("h") for ``key``."""
+        return self._series.get_or_compute(content_key("order_view", self.version, key, grain),
+                                           lambda: order_view(self.rows(key), grain))
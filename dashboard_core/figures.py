@@ -0,0 +1,243 @@
+"""Plotly figure builders shared by the dashboard pages.
+
+Builders are wrapped in :func:`cached_figure`, which keys each figure on a
+content hash of its input data plus its style arguments. A rerun where
+only an unrelated widget changed finds the finished figure in the cache
+instead of rebuilding it. The cache holds built, validated figures rather
+than dict specs because ``st.plotly_chart`` re-validates dicts, which costs
+nearly as much as building the figure. Callers must treat the returned
+figures as read-only.
+
+``st.plotly_chart`` serializes the figure on every rerun. Numeric trace
+data is kept as NumPy arrays, which Plotly 6+ writes as base64 typed
+arrays rather than JSON number lists, and the JSON encoder is orjson when
+it is installed.
+"""
+
+import functools
+from importlib.util import find_spec
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.subplots import make_subplots
+
+from dashboard_core.cache import BoundedCache, content_key
+
+SKU_COLORS = {
+    'Loca Loka Blanco': '#f08a69',
+    'Loca Loka Reposado': '#f7b9a5'
+}
+
+ITEM_COLORS = {'Loca Loka Blanca': '#836ab5', 'Loca Loka Reposado': '#a898cf'}
+
+SEGMENT_COLORS = {
+    'Ironhill': '#55a630',
+    'UrbanFindr': '#aacc00',
+    'Platinum': '#d4d4d4'
+}
+
+CUSTOMER_SEGMENT_COLORS = {'Retail': '#9d84c0', 'Trade': '#cac0db'}
+
+# Horizontal legend above the plot, right aligned
+TOP_LEGEND = dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+
+# Horizontal legend centred below the plot
+BOTTOM_LEGEND = dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
+
+# Line traces with more points than this render with WebGL (Scattergl)
+# instead of SVG
+WEBGL_THRESHOLD = 1000
+
+# Numeric per-point trace attributes kept as typed arrays
+DATA_ATTRIBUTES = ("x", "y", "values")
+
+# Shown in place of a chart when the filtered data has nothing to plot
+EMPTY_MESSAGE = "No data for the selected filters"
+
+figure_cache = BoundedCache(max_entries=256, ttl=None)
+
+if find_spec("orjson") is not None:
+    pio.json.config.default_engine = "orjson"
+
+
+def _array(values) -> np.ndarray:
+    """Values as a NumPy array, so Plotly encodes them as a typed array.
+
+    Integer-valued floats (counts that went through a sum) become int32,
+    which halves their encoded size. Timestamps become epoch milliseconds,
+    which a ``type='date'`` axis reads as dates, instead of ISO strings.
+    """
+    array = np.asarray(values)
+    if array.dtype.kind == "M":
+        return array.astype("datetime64[ms]").astype(np.int64).astype(float)
+    if array.dtype.kind == "f" and len(array) and np.isfinite(array).all():
+        if np.array_equal(array, np.round(array)) and np.abs(array).max() < 2 ** 31:
+            return array.astype(np.int32)
+    return array
+
+
+def _typed_arrays(fig: go.Figure) -> go.Figure:
+    """Pass the numeric per-point data of every trace through :func:`_array`."""
+    for trace in fig.data:
+        for attribute in DATA_ATTRIBUTES:
+            values = trace[attribute] if attribute in trace else None
+            if isinstance(values, np.ndarray) and values.dtype.kind in "fiu":
+                # Plotly ignores assignments equal to the current value
+                trace[attribute] = None
+                trace[attribute] = _array(values)
+    return fig
+
+
+def _month_labels(df, column: str, month_format: str):
+    """``df`` with a ``Period`` ``column`` formatted as text labels for display."""
+    if isinstance(df[column].dtype, pd.PeriodDtype):
+        return df.assign(**{column: df[column].dt.strftime(month_format)})
+    return df
+
+
+def _empty(message: str = EMPTY_MESSAGE) -> go.Figure:
+    """Blank figure with ``message`` in the middle and no axes."""
+    fig = go.Figure()
+    fig.update_layout(
+        xaxis=dict(visible=False), yaxis=dict(visible=False),
+        annotations=[dict(text=message, x=0.5, y=0.5, xref="paper", yref="paper", showarrow=False, font_size=16)]
+    )
+    return fig
+
+
+def _scatter(n_points: int):
+    """Scatter trace type for a line of ``n_points`` points."""
+    return go.Scattergl if n_points > WEBGL_THRESHOLD else go.Scatter
+
+
+def figure_key(builder: str, *args, **kwargs) -> str:
+    """Hash of a builder name, its data arguments and its style arguments."""
+    return content_key(builder, *args, **kwargs)
+
+
+def cached_figure(builder):
+    """Memoize ``builder`` in :data:`figure_cache` by content hash of its arguments.
+
+    Built figures have their numeric trace data passed through :func:`_array`.
+    """
+    @functools.wraps(builder)
+    def wrapper(*args, **kwargs):
+        key = figure_key(builder.__qualname__, *args, **kwargs)
+        return figure_cache.get_or_compute(key, lambda: _typed_arrays(builder(*args, **kwargs)))
+    return wrapper
+
+
+@cached_figure
+def stacked_bar(df, x: str, y: str, color: str, color_map: dict, labels: dict | None = None, layout: dict | None = None,
+                month_format: str = "%Y-%m"):
+    """Bars of ``y`` per ``x``, stacked by ``color``. A month ``x`` is labelled with ``month_format``."""
+    if df.empty:
+        return _empty()
+    df = _month_labels(df, x, month_format)
+    fig = px.bar(df, x=x, y=y, color=color, title="", labels=labels, color_discrete_map=color_map)
+    fig.update_layout(legend_title=None, legend=TOP_LEGEND)
+    if layout:
+        fig.update_layout(**layout)
+    return fig
+
+
+@cached_figure
+def labeled_bar(df, x: str, y: str, color_map: dict):
+    """One bar per ``x`` value with its ``y`` value printed above it."""
+    if df.empty:
+        return _empty()
+    fig = px.bar(df, x=x, y=y, color=x, text=y, color_discrete_map=color_map)
+    fig.update_layout(xaxis_title=x, yaxis_title=y, showlegend=False)
+    fig.update_traces(textposition='outside')
+    return fig
+
+
+@cached_figure
+def horizontal_bar(df, x: str, y: str, color: str):
+    """Single-colour horizontal bars with value labels and no axis titles."""
+    if df.empty:
+        return _empty()
+    fig = px.bar(df, x=x, y=y, orientation='h', text=x, color_discrete_sequence=[color])
+    fig.update_layout(yaxis=dict(title=None), xaxis=dict(title=None))
+    fig.update_traces(textposition='auto')
+    return fig
+
+
+@cached_figure
+def donut(labels: list, values, colors: list, center_text: str, hole: float = .6,
+          textinfo: str = 'percent', text_orientation: str = 'radial', font_size: int = 20,
+          legend: dict | None = None, margin: dict | None = None):
+    """Donut chart with ``center_text`` in the hole and a legend on top.
+
+    All-zero (or no) ``values`` give the empty-state figure, as a pie has no slices to draw.
+    """
+    if not np.asarray(values, dtype=float).sum():
+        return _empty()
+    fig = go.Figure(data=[go.Pie(
+        labels=labels,
+        values=values,
+        hole=hole,
+        marker_colors=colors,
+        textinfo=textinfo,
+        insidetextorientation=text_orientation
+    )])
+    fig.update_layout(
+        annotations=[dict(text=center_text, x=0.5, y=0.5, font_size=font_size, showarrow=False)],
+        legend=legend or dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5)
+    )
+    if margin:
+        fig.update_layout(margin=margin)
+    return fig
+
+
+@cached_figure
+def combo_bar_line(df, x: str, bar: str, line: str, bar_color: str, line_color: str, month_format: str = "%Y-%m"):
+    """Bars of ``bar`` on the left axis with ``line`` on a secondary right axis."""
+    df = _month_labels(df, x, month_format)
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(go.Bar(
+        x=_array(df[x]), y=_array(df[bar]),
+        name=bar, marker_color=bar_color
+    ), secondary_y=False)
+    fig.add_trace(_scatter(len(df))(
+        x=_array(df[x]), y=_array(df[line]),
+        name=line, mode='lines+markers', line=dict(color=line_color)
+    ), secondary_y=True)
+    fig.update_layout(legend_title=None, legend=TOP_LEGEND)
+    fig.update_yaxes(title_text=bar, secondary_y=False)
+    fig.update_yaxes(title_text=line, secondary_y=True)
+    return fig
+
+
+@cached_figure
+def dual_axis_lines(x, left, right, left_name: str, right_name: str,
+                    color: str = '#00FF00', right_color: str = '#32CD32',
+                    right_x=None, x_title: str = "Month"):
+    """Solid ``left`` line on the left axis and dashed ``right`` line on the right axis.
+
+    ``right_x`` gives the right line its own x values, as downsampled
+    series keep different points.
+    """
+    right_x = x if right_x is None else right_x
+    x_type = 'date' if np.asarray(x).dtype.kind == "M" else '-'
+    fig = go.Figure()
+    fig.add_trace(_scatter(len(left))(
+        x=_array(x), y=_array(left), mode='lines', name=left_name,
+        line=dict(color=color, width=3), yaxis='y'
+    ))
+    fig.add_trace(_scatter(len(right))(
+        x=_array(right_x), y=_array(right), mode='lines', name=right_name,
+        line=dict(color=right_color, width=3, dash='dash'), yaxis='y2'
+    ))
+    fig.update_layout(
+        xaxis=dict(title=x_title, tickangle=-45, type=x_type),
+        yaxis=dict(title=left_name, side='left', rangemode='tozero'),
+        yaxis2=dict(title=right_name, overlaying='y', side='right'),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+        margin=dict(l=40, r=40, t=60, b=80),
+        hovermode='x unified'
+    )
+    return fig
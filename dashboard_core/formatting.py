@@ -0,0 +1,43 @@
+"""Display formatting helpers for KPI cards, chart annotations and tables.
+
+Table columns stay numeric; number formats are applied as display
+metadata on the rows actually rendered, so sorting still sees numbers
+and no per-cell Python formatting runs over the whole table.
+"""
+
+import pandas as pd
+
+# Shown in place of missing or blanked values
+PLACEHOLDER = "-"
+
+
+def format_compact(value: float) -> str:
+    """Format large numbers with a k/M suffix, e.g. ``496.3k``."""
+    for threshold, suffix in ((1_000_000, "M"), (1_000, "k")):
+        if abs(value) >= threshold:
+            return f"{value / threshold:.1f}{suffix}"
+    return f"{value:.1f}"
+
+
+def format_delta(percent: float | None) -> str:
+    """Signed percent change such as ``+5.2%``; the placeholder when unknown."""
+    return PLACEHOLDER if percent is None else f"{percent:+.1f}%"
+
+
+def blank_non_positive(frame: pd.DataFrame, columns: list) -> pd.DataFrame:
+    """Copy of ``frame`` with zero or negative values in ``columns`` set missing.
+
+    Integer columns become nullable so they keep their dtype.
+    """
+    frame = frame.copy()
+    for column in columns:
+        values = frame[column]
+        if values.dtype.kind in "iu":
+            values = values.astype("Int64")
+        frame[column] = values.where(values > 0)
+    return frame
+
+
+def style_numbers(frame: pd.DataFrame, formats: dict, placeholder: str = PLACEHOLDER):
+    """Styler that displays ``formats`` (column -> format string) and ``placeholder`` for missing values."""
+    return frame.style.format(formats, na_rep=placeholder)
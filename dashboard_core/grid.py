@@ -0,0 +1,148 @@
+"""Server-side paginated, sortable and searchable tables.
+
+``st.dataframe`` serializes every row it is given to Arrow and ships it
+to the browser. :func:`paged_grid` keeps the table on the server and
+sends one page: a :class:`TableIndex` built once per table content holds
+stable sort permutations, integer codes for the filterable columns and a
+lower-cased search column, so a query is a few vectorized masks and a
+permutation slice and the payload stays the same size however long the
+table is.
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from dashboard_core.cache import BoundedCache, content_key
+from dashboard_core.formatting import style_numbers
+
+PAGE_SIZE = 25
+
+index_cache = BoundedCache(max_entries=32, ttl=600.0)
+
+
+def _by_label(values: pd.Series) -> pd.Series:
+    """``values`` with unordered categories sorted by label, so they sort alphabetically.
+
+    Shared dictionaries (see :mod:`dashboard_core.schema`) keep categories
+    in first-seen order.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype) and not values.cat.ordered:
+        return values.cat.reorder_categories(values.cat.categories.sort_values())
+    return values
+
+
+class TableIndex:
+    """Sort, filter and search structures for one table."""
+
+    def __init__(self, frame: pd.DataFrame, search_columns: tuple = (), category_columns: tuple = ()):
+        self.frame = frame.reset_index(drop=True)
+        self._orders = {}
+        # Column -> (integer codes, sorted distinct values)
+        self.categories = {column: pd.factorize(_by_label(self.frame[column]), sort=True) for column in category_columns}
+        self.search_text = None
+        if search_columns:
+            text = self.frame[search_columns[0]].astype(str).str.lower()
+            for column in search_columns[1:]:
+                text = text + "\n" + self.frame[column].astype(str).str.lower()
+            self.search_text = text
+        self._searches = BoundedCache(max_entries=32, ttl=None)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def order(self, column: str, ascending: bool = True) -> np.ndarray:
+        """Row positions sorted by ``column``, computed once per direction."""
+        key = (column, ascending)
+        if key not in self._orders:
+            ranked = _by_label(self.frame[column]).sort_values(ascending=ascending, kind="stable", na_position="last")
+            self._orders[key] = ranked.index.to_numpy()
+        return self._orders[key]
+
+    def options(self, column: str) -> list:
+        """Distinct values of a category column, sorted."""
+        return self.categories[column][1].tolist()
+
+    def _search_mask(self, text: str) -> np.ndarray:
+        needle = text.strip().lower()
+        return self._searches.get_or_compute(
+            needle, lambda: self.search_text.str.contains(needle, regex=False).to_numpy()
+        )
+
+    def query(self, sort_by: str | None = None, ascending: bool = True,
+              filters: dict | None = None, search: str = "") -> np.ndarray:
+        """Positions of the matching rows in display order."""
+        mask = np.ones(len(self.frame), dtype=bool)
+        for column, selected in (filters or {}).items():
+            if selected:
+                codes, values = self.categories[column]
+                mask &= np.isin(codes, values.get_indexer(list(selected)))
+        if search.strip() and self.search_text is not None:
+            mask &= self._search_mask(search)
+        positions = self.order(sort_by, ascending) if sort_by else np.arange(len(self.frame))
+        return positions[mask[positions]]
+
+
+def table_index(frame: pd.DataFrame, search_columns: tuple = (), category_columns: tuple = ()) -> TableIndex:
+    """The :class:`TableIndex` for ``frame``, shared by every rerun that passes equal content."""
+    key = content_key("table_index", frame, list(search_columns), list(category_columns))
+    return index_cache.get_or_compute(key, lambda: TableIndex(frame, search_columns, category_columns))
+
+
+def paged_grid(frame: pd.DataFrame, key: str, page_size: int = PAGE_SIZE,
+               search_columns: list | None = None, category_columns: list | None = None,
+               sortable: bool = True, formats: dict | None = None, **dataframe_kwargs):
+    """Render one page of ``frame`` with server-side search, filters, sort and paging.
+
+    ``search_columns`` defaults to the text columns. ``formats`` maps
+    columns to display format strings, applied to the shown page only.
+    Extra keyword arguments go to ``st.dataframe``.
+    """
+    if search_columns is None:
+        search_columns = [column for column in frame.columns
+                          if frame[column].dtype == object or isinstance(frame[column].dtype, pd.StringDtype)]
+    index = table_index(frame, tuple(search_columns), tuple(category_columns or ()))
+
+    search, sort_by, ascending = "", None, True
+    controls = st.columns([3, 2, 1]) if sortable else st.columns([1])
+    if search_columns:
+        with controls[0]:
+            search = st.text_input("Search", key=f"{key}_search", placeholder="Search...",
+                                   label_visibility="collapsed")
+    if sortable:
+        with controls[1]:
+            sort_by = st.selectbox("Sort by", [None, *frame.columns], key=f"{key}_sort",
+                                   format_func=lambda column: "Sort by..." if column is None else str(column),
+                                   label_visibility="collapsed")
+        with controls[2]:
+            ascending = st.toggle("Ascending", value=False, key=f"{key}_ascending")
+
+    filters = {}
+    if category_columns:
+        for column, box in zip(category_columns, st.columns(len(category_columns))):
+            with box:
+                filters[column] = st.multiselect(column, index.options(column), key=f"{key}_filter_{column}")
+
+    positions = index.query(sort_by, ascending, filters, search)
+    pages = max(1, -(-len(positions) // page_size))
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = st.session_state.get(page_key, 1)
+
+    start = (page - 1) * page_size
+    shown = positions[start:start + page_size]
+    dataframe_kwargs.setdefault("use_container_width", True)
+    dataframe_kwargs.setdefault("hide_index", True)
+    page_rows = index.frame.iloc[shown]
+    st.dataframe(style_numbers(page_rows, formats) if formats else page_rows, **dataframe_kwargs)
+
+    footer, pager = st.columns([3, 1])
+    with footer:
+        if len(positions):
+            st.caption(f"Rows {start + 1}-{start + len(shown)} of {len(positions)}")
+        else:
+            st.caption("No matching rows")
+    if pages > 1:
+        with pager:
+            st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, key=page_key)
@@ -0,0 +1,400 @@
+"""Data sets shared by the two Loca Loka pages.
+
+Every loader is wrapped in ``st.cache_data`` so a session that visits both
+pages builds each data set once per cache lifetime instead of once per
+page per rerun. Live figures and the wide monthly tables come from a
+simulated order feed: a deterministic order history whose lines become
+visible as their timestamps pass.
+"""
+
+import functools
+from datetime import date
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from dashboard_core.buckets import BucketCounter
+from dashboard_core.lifecycle import REGULAR, customer_lifecycle, lifecycle_kpis
+from dashboard_core.pivot import SparsePivot
+from dashboard_core.refresh import IncrementalFeed, after_high_water_mark
+from dashboard_core.schema import compact
+from dashboard_core.topn import RunningTopK
+
+LOTTIE_URL = "https://assets9.lottiefiles.com/packages/lf20_zlrpnoxz.json"
+
+ITEMS = ['Loca Loka Blanca', 'Loca Loka Reposado']
+
+# Outlets in the order feed: (name, customer category, segment)
+OUTLETS = [
+    ('Pullman Singapore Hill Street (El Chido)', 'Trade', 'UrbanFindr'),
+    ('Commonwealth Concepts Pte Ltd (Kinki)', 'Trade', 'UrbanFindr'),
+    ('Ironhill Hospitality Pte Ltd', 'Trade', 'Ironhill'),
+    ('Ipanema World Music Bar', 'Trade', 'UrbanFindr'),
+    ('Marina Bay Sands Pte. Ltd.', 'Trade', 'UrbanFindr'),
+    ('Redhill Communications', 'Retail', 'UrbanFindr'),
+    ("Morton's of Chicago The Steakhouse", 'Trade', 'UrbanFindr'),
+    ('Lavi Tapas', 'Trade', 'UrbanFindr'),
+    ('Chimichanga Little India', 'Trade', 'UrbanFindr'),
+    ('Pocket Rocket', 'Trade', 'UrbanFindr'),
+    ('3 Delinquents', 'Trade', 'UrbanFindr'),
+    ('Commonwealth Concepts Pte Ltd (Ginkgo by Kinki)', 'Trade', 'UrbanFindr'),
+    ("21 Carpenter - Kee's", 'Trade', 'UrbanFindr'),
+    ('Ashwin Segar', 'Retail', 'UrbanFindr'),
+    ('Bar Bon Funk', 'Trade', 'UrbanFindr'),
+    ('Bar Madame', 'Trade', 'UrbanFindr'),
+    ('Brooklyn Bar', 'Trade', 'UrbanFindr'),
+    ('Burnt Ends', 'Trade', 'UrbanFindr'),
+    ('67 Pall Mall Singapore Ltd', 'Trade', 'UrbanFindr'),
+    ('Andaz Hotel (Mr Stork)', 'Trade', 'UrbanFindr'),
+    ('Artemis Grill & Sky Bar', 'Trade', 'UrbanFindr'),
+    ('Capella Hotel', 'Trade', 'UrbanFindr'),
+    ("Chimi's 313 Somerset", 'Trade', 'UrbanFindr'),
+    ('Chimichanga Holland Village', 'Trade', 'UrbanFindr'),
+    ('THE URBANFINDR PTE. LTD. - EXTRA SPACE BOON KENG WAREHOUSE', 'Trade', 'Platinum'),
+    ('ATHENA ALLIANCE PTE. LTD. - MEZAME', 'Trade', 'Platinum'),
+    ('LEGENDS CULTURE LLP', 'Trade', 'Platinum'),
+    ('WARREN GOLF & COUNTRY CLUB', 'Retail', 'Platinum'),
+    ('IPG HOSPITALITY PTE. LTD. - AKASA', 'Trade', 'Platinum'),
+    ('CENTROFOOD INDUSTRIES PTE. LTD. - THE FAMOUS KITCHEN', 'Trade', 'Platinum'),
+    ('BAR. TER HDGS PTE. LTD. - BAR. TER', 'Trade', 'Platinum'),
+    ('CURIO CAT PTE. LTD. - SIDES', 'Trade', 'Platinum'),
+    ('KIN F & B PTE. LTD. - YEN IZAKAYA', 'Trade', 'Platinum'),
+    ('EL Development (Ventures) Pte Ltd c/o Pullman Singapore Hill Street', 'Trade', 'UrbanFindr'),
+]
+
+# Order-line text columns stored dictionary-encoded
+LINE_CATEGORIES = ('customer', 'customer_category', 'segment', 'item', 'status')
+
+# Aggregates kept current by the Singapore page's refresh feed
+FEED_AGGREGATES = {
+    "segment_sales": (["month", "customer_category"], "sales_sgd"),
+    "item_quantity": (["item"], "quantity"),
+    "daily_orders": (["day"], "order_id"),
+}
+
+# KPI card deltas compare with the values this many days earlier
+DELTA_DAYS = 30
+
+# Customers shown by name in "Top Customers"; the rest are one "Other" bar
+TOP_CUSTOMERS = 12
+
+# Customers per page in the wide monthly tables
+PAGE_SIZE = 25
+
+# Selectbox value that leaves a Singapore page filter off
+ALL = 'All'
+
+# Filtered feeds kept per process, one per combination of the Singapore page filters
+FILTERED_FEEDS = 16
+
+# Monthly depletion bins: average bottles per active month
+DEPLETION_EDGES = [1, 2, 3, 4, 5, 6, 7, 13, 19, 25]
+
+MONTHS = pd.period_range('2024-12', '2025-09', freq='M')
+
+
+def _sku_by_month(blanco: list, reposado: list) -> pd.DataFrame:
+    """Long month x SKU frame, the format Plotly Express stacks by colour."""
+    return compact(pd.DataFrame({
+        'month': MONTHS.append(MONTHS),
+        'SKU': ['Loca Loka Blanco'] * len(MONTHS) + ['Loca Loka Reposado'] * len(MONTHS),
+        'total_quantity': blanco + reposado
+    }), categorical=['SKU'], integer=['total_quantity'])
+
+
+def sample_orders(n_orders: int = 300, start: date = date(2024, 10, 1), end: date | None = None,
+                  seed: int = 7) -> pd.DataFrame:
+    """Deterministic Loca Loka order lines from ``start`` to the end of ``end``."""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp(start)
+    end = pd.Timestamp(end or date.today()) + pd.Timedelta(days=1)
+
+    # A few large accounts order far more often than the long tail
+    weights = 1.0 / np.arange(1, len(OUTLETS) + 1) ** 1.3
+    outlet = rng.choice(len(OUTLETS), size=n_orders, p=weights / weights.sum())
+    order_ts = np.sort(start.value + rng.integers(0, (end - start).value, size=n_orders))
+
+    # One or two lines per order, one per item
+    lines = rng.integers(1, 3, size=n_orders)
+    line_order = np.repeat(np.arange(n_orders), lines)
+    first_item = rng.choice(len(ITEMS), size=n_orders, p=[0.76, 0.24])
+    item = first_item[line_order]
+    item[np.r_[False, line_order[1:] == line_order[:-1]]] ^= 1
+
+    names, categories, segments = (np.array(column, dtype=object) for column in zip(*OUTLETS))
+    ts = pd.to_datetime(order_ts[line_order])
+    quantity = rng.integers(1, 7, size=len(line_order))
+    status = np.where(ts > end - pd.Timedelta(days=7), 'Pending', 'Completed')
+    lines = pd.DataFrame({
+        'order_id': line_order + 1,
+        'order_ts': ts,
+        'customer': names[outlet[line_order]],
+        'customer_category': categories[outlet[line_order]],
+        'segment': segments[outlet[line_order]],
+        'item': np.array(ITEMS, dtype=object)[item],
+        'status': status,
+        'quantity': quantity,
+        'sales_sgd': quantity * np.where(item == 0, 68.0, 82.0),
+    })
+    return compact(lines, categorical=LINE_CATEGORIES, integer=['quantity'])
+
+
+def order_filters(status: str = ALL, item: str = ALL, customer_category: str = ALL,
+                  ironhill: str = ALL) -> tuple:
+    """Hashable ``(column, value)`` pairs for the Singapore page selectboxes; empty for all "All".
+
+    ``ironhill`` is "Yes" for the Ironhill segment only and "No" for every other segment.
+    """
+    filters = [(column, value) for column, value in
+               (('status', status), ('item', item), ('customer_category', customer_category)) if value != ALL]
+    if ironhill != ALL:
+        filters.append(('ironhill', ironhill == 'Yes'))
+    return tuple(filters)
+
+
+def filter_lines(lines: pd.DataFrame, filters: tuple = ()) -> pd.DataFrame:
+    """Order lines matching every pair of :func:`order_filters`."""
+    if not filters:
+        return lines
+    mask = np.ones(len(lines), dtype=bool)
+    for column, value in filters:
+        if column == 'ironhill':
+            mask &= (lines['segment'] == 'Ironhill').to_numpy() == value
+        else:
+            mask &= (lines[column] == value).to_numpy()
+    return lines[mask]
+
+
+def fetch_orders_since(high_water_mark: tuple | None, filters: tuple = ()) -> pd.DataFrame:
+    """Order lines after ``high_water_mark`` whose timestamp has already passed."""
+    lines = filter_lines(_order_history(), filters)
+    lines = lines[lines['order_ts'] <= pd.Timestamp.now()]
+    return after_high_water_mark(lines, high_water_mark)
+
+
+@st.cache_resource(show_spinner=False)
+def _order_history() -> pd.DataFrame:
+    return sample_orders()
+
+
+class MonthlyDepletion:
+    """Customers bucketed by average bottles per active month.
+
+    Folds feed deltas into a customer x month bottle total and re-bins
+    only the customers a delta touches.
+    """
+
+    def __init__(self, edges: list = DEPLETION_EDGES):
+        self.bottles = None
+        self.buckets = BucketCounter(edges)
+
+    def fold(self, delta: pd.DataFrame):
+        month = delta['order_ts'].dt.to_period('M').rename('month')
+        partial = delta.groupby([delta['customer'], month], observed=True)['quantity'].sum()
+        self.bottles = partial if self.bottles is None else self.bottles.add(partial, fill_value=0)
+        touched = partial.index.unique(level='customer')
+        per_month = self.bottles[self.bottles.index.get_level_values('customer').isin(touched)]
+        average = per_month.groupby(level='customer', observed=True).mean()
+        self.buckets.update(average.index, average.to_numpy())
+
+
+def _segment(name: str) -> Callable:
+    return lambda lines: lines['segment'] == name
+
+
+def _pullman(lines: pd.DataFrame) -> pd.Series:
+    return lines['customer'].str.contains('Pullman', regex=False)
+
+
+@st.cache_resource(show_spinner=False, max_entries=FILTERED_FEEDS)
+def get_order_feed(filters: tuple = ()) -> IncrementalFeed:
+    """Process-wide feed of the order lines matching ``filters``, shared by every session.
+
+    Unfiltered, it serves both Loca Loka pages. Each combination of the
+    Singapore page filters gets its own feed over the matching lines, so
+    its KPIs, charts and tables are folded incrementally like the
+    unfiltered ones.
+    """
+    source = functools.partial(fetch_orders_since, filters=filters)
+    return IncrementalFeed(source, FEED_AGGREGATES, consumers={
+        'depletion': MonthlyDepletion(),
+        'top_customers': RunningTopK(TOP_CUSTOMERS, key='customer', value='quantity'),
+        # Customer x month pivots for the wide monthly tables
+        'urbanfindr_orders': SparsePivot('customer', 'order_id', where=_segment('UrbanFindr')),
+        'urbanfindr_bottles': SparsePivot('customer', 'quantity', where=_segment('UrbanFindr')),
+        'platinum_bottles': SparsePivot('customer', 'quantity', where=_segment('Platinum')),
+        'pullman_bottles': SparsePivot('customer', 'quantity', where=_pullman),
+    })
+
+
+def monthly_table(name: str, months: int = 12, page: int = 0, page_size: int = PAGE_SIZE,
+                  filters: tuple = ()) -> tuple[pd.DataFrame, int]:
+    """One page of a customer x month pivot from the feed, and its active row count."""
+    feed = get_order_feed(filters)
+    feed.refresh()
+    with feed.lock:
+        frame, rows = feed.consumers[name].page(months=months, page=page, page_size=page_size)
+    return frame.rename(columns={'customer': 'Customer_Name'}), rows
+
+
+def render_monthly_table(name: str, key: str, page_size: int = PAGE_SIZE, filters: tuple = ()):
+    """One page of a customer x month table; only the shown rows are made dense."""
+    page = st.session_state.get(key, 1)
+    table, rows = monthly_table(name, page=page - 1, page_size=page_size, filters=filters)
+    pages = max(1, -(-rows // page_size))
+    if page > pages:
+        st.session_state[key] = page = pages
+        table, rows = monthly_table(name, page=page - 1, page_size=page_size, filters=filters)
+    st.dataframe(table, use_container_width=True, hide_index=True)
+    if pages > 1:
+        st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, key=key)
+
+
+# --- Singapore page ---
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def load_kpis_as_of(day: date, filters: tuple = ()) -> dict:
+    """KPI card values, over the lines matching ``filters``, as they stood at the start of ``day``.
+
+    The live cards are compared with this snapshot. It only moves once a
+    day, so it is cached instead of being rescanned on every refresh.
+    """
+    cutoff = pd.Timestamp(day)
+    lines = filter_lines(_order_history(), filters)
+    lines = lines[lines['order_ts'] < cutoff]
+    customers = lines.groupby('customer', observed=True).agg(
+        last_purchase=('order_ts', 'max'),
+        orders=('order_id', 'nunique'),
+    )
+    return {'orders': lines['order_id'].nunique(), **lifecycle_kpis(customers, now=cutoff)}
+
+
+def daily_orders(feed: IncrementalFeed, days: int = 30) -> pd.DataFrame:
+    """Orders per day over the last ``days`` days, for the first KPI card."""
+    today = pd.Timestamp.now().normalize()
+    window = pd.date_range(today - pd.Timedelta(days=days - 1), today, freq='D')
+    counts = feed.aggregates["daily_orders"]
+    counts = pd.Series(0, index=window) if counts is None else counts.reindex(window, fill_value=0)
+    return pd.DataFrame({'orders': counts.to_numpy()}, index=window)
+
+
+def sales_segment(feed: IncrementalFeed) -> pd.DataFrame:
+    """Data for "Sales - Customer Segment" (stacked bar)."""
+    sales = feed.aggregates["segment_sales"]
+    if sales is None:
+        return pd.DataFrame({'month': pd.PeriodIndex([], freq='M'), 'segment': [], 'sales_sgd': []})
+    frame = sales.sort_index().reset_index()
+    return pd.DataFrame({
+        'month': frame['month'],
+        'segment': frame['customer_category'],
+        'sales_sgd': frame['sales_sgd'],
+    })
+
+
+def depletion_product(feed: IncrementalFeed) -> pd.DataFrame:
+    """Data for "Depletion - Product" (simple bar) and "Depletion by SKU" (donut)."""
+    quantity = feed.aggregates["item_quantity"]
+    quantity = pd.Series(0, index=ITEMS) if quantity is None else quantity.reindex(ITEMS, fill_value=0)
+    return pd.DataFrame({'Item': ITEMS, 'Quantity': quantity.astype(int).to_numpy()})
+
+
+def top_customers(feed: IncrementalFeed) -> pd.DataFrame:
+    """Data for "Top Customers" (horizontal bar), sorted ascending for the chart."""
+    with feed.lock:
+        quantity = feed.consumers['top_customers'].result()
+    return pd.DataFrame({
+        'customer': quantity.index.astype(str),
+        'Quantity': quantity.astype(int).to_numpy(),
+    }).sort_values(by='Quantity', ascending=True)
+
+
+def monthly_depletion(feed: IncrementalFeed, preview: int = 3) -> pd.DataFrame:
+    """Data for "Monthly Depletion Categorisation" (table), with a few names per bin."""
+    buckets = feed.consumers['depletion'].buckets
+    names = []
+    with feed.lock:
+        counts = buckets.table()
+        for label, count in zip(counts['bin'], counts['count']):
+            shown = buckets.members(label, page_size=preview)
+            names.append(', '.join(shown) + (f' (+{count - len(shown)} more)' if count > len(shown) else ''))
+    return pd.DataFrame({
+        'Monthly Depletion': counts['bin'],
+        '# of Customer': counts['count'],
+        'Customer Names': names,
+    })
+
+
+# --- SG page: Overview tab ---
+
+@st.cache_data(show_spinner=False)
+def load_primary_depletion() -> pd.DataFrame:
+    return _sku_by_month(
+        [50, 80, 70, 90, 150, 120, 110, 60, 100, 100],
+        [30, 40, 30, 40, 60, 50, 80, 50, 50, 40]
+    )
+
+
+@st.cache_data(show_spinner=False)
+def load_secondary_depletion() -> pd.DataFrame:
+    return compact(pd.DataFrame({
+        'month': MONTHS.append([MONTHS, MONTHS]),
+        'Segment': ['Ironhill'] * 10 + ['UrbanFindr'] * 10 + ['Platinum'] * 10,
+        'total_quantity': [30, 40, 50, 60, 70, 80, 90, 100, 80, 60] + [40, 50, 30, 60, 120, 110, 80, 90, 70, 50] + [20, 30, 20, 40, 30, 20, 10, 15, 20, 10]
+    }), categorical=['Segment'], integer=['total_quantity'])
+
+
+@st.cache_data(show_spinner=False)
+def load_platinum_loca_loka() -> pd.DataFrame:
+    return _sku_by_month(
+        [5, 8, 7, 9, 15, 12, 11, 6, 10, 10],
+        [3, 4, 3, 4, 6, 5, 8, 5, 5, 4]
+    )
+
+
+@st.cache_data(show_spinner=False)
+def load_urbanfindr_loca_loka() -> pd.DataFrame:
+    return _sku_by_month(
+        [25, 30, 20, 40, 100, 90, 70, 80, 60, 40],
+        [10, 20, 10, 20, 30, 20, 40, 20, 20, 10]
+    )
+
+
+@st.cache_data(show_spinner=False)
+def load_platinum_sales_qty() -> pd.DataFrame:
+    return pd.DataFrame({
+        'month': pd.period_range('2025-03', '2025-09', freq='M'),
+        'total_quantity': [5, 10, 8, 18, 15, 75, 80],
+        'unique_outlets': [2, 5, 4, 8, 20, 15, 100]
+    })
+
+
+@st.cache_data(show_spinner=False)
+def load_urbanfindr_sales_qty() -> pd.DataFrame:
+    return pd.DataFrame({
+        'month': pd.period_range('2025-05', '2025-10', freq='M'),
+        'total_quantity': [10, 12, 8, 10, 15, 10],
+        'unique_outlets': [100, 160, 50, 30, 60, 30]
+    })
+
+
+# --- SG page: customer tabs ---
+
+@st.cache_data(show_spinner=False, ttl=60)
+def load_active_buyers(segment: str) -> pd.DataFrame:
+    """Lifecycle table for one segment's customers, most active first."""
+    lines = fetch_orders_since(None)
+    lines = lines[lines['segment'] == segment]
+    table = customer_lifecycle(lines)
+    if segment == 'Platinum':
+        table['buyer_status'] = table['buyer_status'].replace({REGULAR: 'Platinum Regular'})
+    categories = lines.drop_duplicates('customer').set_index('customer')['customer_category']
+    buyers = pd.DataFrame({
+        'customer': table.index,
+        'last_purchase': table['last_purchase'].to_numpy(),
+        'active_windows': table['active_windows'].to_numpy(),
+        'customer_category': categories.reindex(table.index).to_numpy(),
+        'buyer_status': table['buyer_status'].to_numpy(),
+    }).sort_values(['active_windows', 'last_purchase'], ascending=False, ignore_index=True)
+    return compact(buyers, categorical=['customer', 'customer_category', 'buyer_status'], integer=['active_windows'])
@@ -0,0 +1,54 @@
+"""KPI metric strip rendered as one streamlit-elements mount.
+
+Each ``elements`` frame is a separate component with its own React root
+and websocket traffic. The strip builds one payload for every card
+(title, value and delta, already formatted) and renders all cards in a
+single frame.
+"""
+
+from typing import NamedTuple
+
+from streamlit_elements import elements, mui
+
+from dashboard_core.formatting import format_delta
+
+
+class MetricCard(NamedTuple):
+    title: str
+    value: str
+    delta: str
+    color: str
+
+
+def metric_card(title: str, value: str, percent: float | None) -> MetricCard:
+    """Card payload with the delta formatted and coloured by its sign."""
+    if percent is None:
+        color = "text.secondary"
+    else:
+        color = "success.main" if percent >= 0 else "error.main"
+    return MetricCard(title, value, format_delta(percent), color)
+
+
+def metric_strip(cards: list[MetricCard], key: str = "metric_strip"):
+    """Render ``cards`` side by side in one component."""
+    with elements(key):
+        mui.Box(
+            *(
+                mui.Card(
+                    mui.CardContent(
+                        mui.Typography(card.title, variant="body2", color="textSecondary"),
+                        mui.Typography(card.value, variant="h5", component="div"),
+                        mui.Typography(card.delta, variant="body2", color=card.color)
+                    ),
+                    key=card.title,
+                    sx={"minWidth": 120}
+                )
+                for card in cards
+            ),
+            sx={
+                "display": "grid",
+                "gridTemplateColumns": f"repeat({len(cards)}, minmax(120px, 1fr))",
+                "gap": 1,
+                "margin": 1
+            }
+        )
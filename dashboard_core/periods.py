@@ -0,0 +1,53 @@
+"""Comparison windows and period labels for period-over-period KPIs.
+
+A resolved date window is compared with either the window of the same
+length just before it or the same dates a year earlier. Rather than
+filtering the order lines once per window, rows are labelled with the
+period they fall in and aggregated in one grouped pass.
+"""
+
+from datetime import date
+
+import numpy as np
+
+from dashboard_core.dates import in_intervals, previous_period
+
+PREVIOUS_PERIOD = "Previous period"
+SAME_PERIOD_LAST_YEAR = "Same period last year"
+COMPARISONS = (PREVIOUS_PERIOD, SAME_PERIOD_LAST_YEAR)
+
+
+def _year_earlier(day: date) -> date:
+    try:
+        return day.replace(year=day.year - 1)
+    except ValueError:
+        # 29 February
+        return day.replace(year=day.year - 1, day=28)
+
+
+def same_period_last_year(intervals) -> tuple:
+    """The same calendar dates one year earlier."""
+    return tuple((_year_earlier(start), _year_earlier(end)) for start, end in intervals)
+
+
+def comparison_window(intervals, comparison: str = PREVIOUS_PERIOD) -> tuple:
+    """Intervals to compare ``intervals`` with."""
+    if comparison == SAME_PERIOD_LAST_YEAR:
+        return same_period_last_year(intervals)
+    if comparison == PREVIOUS_PERIOD:
+        return previous_period(intervals)
+    raise ValueError(f"Unknown comparison: {comparison!r}")
+
+
+def overlaps(first, second) -> bool:
+    """Whether any interval of ``first`` overlaps any interval of ``second``."""
+    return any(start < other_end and other_start < end
+               for start, end in first for other_start, other_end in second)
+
+
+def period_labels(day_offsets: np.ndarray, windows: list[np.ndarray]) -> np.ndarray:
+    """Index of the first window (as day-offset bounds) holding each day; -1 for none."""
+    labels = np.full(len(day_offsets), -1, dtype=np.int64)
+    for period in reversed(range(len(windows))):
+        labels[in_intervals(day_offsets, windows[period])] = period
+    return labels
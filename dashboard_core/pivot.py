@@ -0,0 +1,153 @@
+"""Sparse customer x month pivots built from long-format order lines.
+
+Wide monthly tables are mostly empty: most outlets order in a handful of
+months. A :class:`SparsePivot` stores only the non-zero cells as sorted
+COO keys (row code and month ordinal packed into one integer) with their
+values, folds new order lines in by merging keys, and keeps trailing
+month windows current by adding the cells that enter and subtracting the
+ones that leave. A dense frame is produced only for the rows on screen.
+"""
+
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from dashboard_core.cube import month_ordinals
+
+MONTH_BITS = 16
+MONTH_MASK = (1 << MONTH_BITS) - 1
+
+
+def _coalesce(keys: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Sorted unique keys with the values of duplicate keys summed."""
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return unique, np.bincount(inverse, weights=values, minlength=len(unique))
+
+
+class RollingWindow:
+    """Per-row totals over the trailing ``months`` months of a pivot."""
+
+    def __init__(self, pivot: "SparsePivot", months: int):
+        self.pivot = pivot
+        self.months = months
+        self.end = None
+        self.totals = np.zeros(0)
+
+    def _column(self, first: int, last: int) -> np.ndarray:
+        """Row totals of the months in ``[first, last]``."""
+        pivot = self.pivot
+        month = pivot.keys & MONTH_MASK
+        inside = (month >= first) & (month <= last)
+        # bincount returns int64 when no cell is inside, which += would not accept
+        return np.bincount(pivot.keys[inside] >> MONTH_BITS, weights=pivot.values[inside],
+                           minlength=len(pivot.rows)).astype(float, copy=False)
+
+    def _resize(self):
+        if len(self.totals) < len(self.pivot.rows):
+            self.totals = np.pad(self.totals, (0, len(self.pivot.rows) - len(self.totals)))
+
+    def sync(self, end: int) -> np.ndarray:
+        """Slide the window to end at month ordinal ``end`` and return the totals."""
+        self._resize()
+        if self.end is None or abs(end - self.end) >= self.months:
+            self.totals = self._column(end - self.months + 1, end)
+        elif end > self.end:
+            self.totals += self._column(self.end + 1, end)
+            self.totals -= self._column(self.end - self.months + 1, end - self.months)
+        elif end < self.end:
+            self.totals -= self._column(end + 1, self.end)
+            self.totals += self._column(end - self.months + 1, self.end - self.months)
+        self.end = end
+        return self.totals
+
+    def add(self, keys: np.ndarray, values: np.ndarray):
+        """Fold newly added cells that fall inside the current window."""
+        if self.end is None:
+            return
+        self._resize()
+        month = keys & MONTH_MASK
+        inside = (month > self.end - self.months) & (month <= self.end)
+        np.add.at(self.totals, keys[inside] >> MONTH_BITS, values[inside])
+
+
+class SparsePivot:
+    """Sum of ``value`` (or distinct orders, for ``"order_id"``) by ``row`` x month.
+
+    ``where(lines)`` optionally selects the order lines that belong to
+    this pivot. Whole orders must arrive in the same :meth:`fold` call.
+    """
+
+    def __init__(self, row: str, value: str, where: Callable | None = None):
+        self.row = row
+        self.value = value
+        self.where = where
+        self.rows = pd.Index([])
+        self.keys = np.empty(0, dtype=np.int64)
+        self.values = np.empty(0)
+        self.integer = value == "order_id"
+        self.windows = {}
+
+    def _row_codes(self, labels: pd.Series) -> np.ndarray:
+        codes = self.rows.get_indexer(labels)
+        new = codes == -1
+        if new.any():
+            added = pd.Index(labels[new]).unique()
+            self.rows = self.rows.append(added)
+            codes[new] = self.rows.get_indexer(labels[new])
+        return codes.astype(np.int64)
+
+    def fold(self, lines: pd.DataFrame):
+        """Add order lines to the pivot and to every open window."""
+        if self.where is not None:
+            lines = lines[self.where(lines)]
+        if lines.empty:
+            return
+        keys = (self._row_codes(lines[self.row]) << MONTH_BITS) | month_ordinals(lines["order_ts"])
+        if self.value == "order_id":
+            # One count per distinct (cell, order)
+            pairs = pd.DataFrame({"key": keys, "order": lines["order_id"].to_numpy()}).drop_duplicates()
+            keys, values = _coalesce(pairs["key"].to_numpy(), np.ones(len(pairs)))
+        else:
+            self.integer = lines[self.value].dtype.kind in "iu"
+            keys, values = _coalesce(keys, lines[self.value].to_numpy(dtype=float))
+        self.keys, self.values = _coalesce(np.concatenate([self.keys, keys]),
+                                           np.concatenate([self.values, values]))
+        for window in self.windows.values():
+            window.add(keys, values)
+
+    def window(self, months: int) -> RollingWindow:
+        """The trailing ``months`` window, created on first use and kept current by :meth:`fold`."""
+        if months not in self.windows:
+            self.windows[months] = RollingWindow(self, months)
+        return self.windows[months]
+
+    def dense(self, rows: np.ndarray, months: np.ndarray) -> np.ndarray:
+        """Dense ``len(rows) x len(months)`` block for row codes ``rows``."""
+        block = np.zeros((len(rows), len(months)))
+        row_position = pd.Index(rows).get_indexer(self.keys >> MONTH_BITS)
+        month_position = pd.Index(months).get_indexer(self.keys & MONTH_MASK)
+        hit = (row_position >= 0) & (month_position >= 0)
+        block[row_position[hit], month_position[hit]] = self.values[hit]
+        return block
+
+    def page(self, end: pd.Timestamp | None = None, months: int = 12, page: int = 0,
+             page_size: int = 25, label_format: str = "%b %Y") -> tuple[pd.DataFrame, int]:
+        """One page of rows, busiest first over the trailing ``months`` window.
+
+        Returns the dense frame (row label, one column per month, Total)
+        and the number of rows with activity in the window.
+        """
+        end = month_ordinals(pd.Series([end or pd.Timestamp.now()]))[0]
+        totals = self.window(months).sync(end)
+        active = np.flatnonzero(totals)
+        ranked = active[np.argsort(-totals[active], kind="stable")]
+        shown = ranked[page * page_size:(page + 1) * page_size]
+
+        month_range = np.arange(end - months + 1, end + 1)
+        labels = pd.to_datetime(month_range.astype("datetime64[M]")).strftime(label_format)
+        dtype = np.int64 if self.integer else float
+        frame = pd.DataFrame(self.dense(shown, month_range).astype(dtype), columns=labels)
+        frame.insert(0, self.row, self.rows[shown])
+        frame["Total"] = totals[shown].astype(dtype)
+        return frame, len(active)
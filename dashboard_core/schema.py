@@ -0,0 +1,76 @@
+"""Memory-compact column types for long order-line frames.
+
+Customer names, items, segments and statuses repeat on every order line.
+Stored as object-dtype strings each row holds a pointer to a Python
+string; stored as ``Categorical`` each row holds a small integer code.
+The categories come from a process-wide :class:`Dictionary` per column,
+which only ever grows, so a value has the same code in every frame
+encoded by the process. Integer measures are downcast to the narrowest
+dtype that holds their range.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Integer dtypes tried, narrowest first
+INTEGER_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+
+
+class Dictionary:
+    """Append-only vocabulary of one text column.
+
+    A value keeps its code for the life of the process, so the codes of
+    a frame encoded earlier stay valid against the grown vocabulary.
+    """
+
+    def __init__(self):
+        self.values = pd.Index([], dtype=object)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.values)
+
+    def encode(self, values) -> pd.Categorical:
+        """``values`` as a ``Categorical`` over the whole vocabulary."""
+        values = pd.Series(values, dtype=object)
+        with self._lock:
+            codes = self.values.get_indexer(values)
+            new = (codes == -1) & values.notna().to_numpy()
+            if new.any():
+                self.values = self.values.append(pd.Index(values[new].unique(), dtype=object))
+                codes = self.values.get_indexer(values)
+            categories = self.values
+        return pd.Categorical.from_codes(codes, categories)
+
+
+_dictionaries = {}
+_dictionaries_lock = threading.Lock()
+
+
+def dictionary(name: str) -> Dictionary:
+    """The shared :class:`Dictionary` for column ``name``."""
+    with _dictionaries_lock:
+        if name not in _dictionaries:
+            _dictionaries[name] = Dictionary()
+        return _dictionaries[name]
+
+
+def downcast_integers(values: pd.Series) -> pd.Series:
+    """``values`` in the narrowest integer dtype that holds their range."""
+    if values.dtype.kind not in "iu" or values.empty:
+        return values
+    low, high = values.min(), values.max()
+    for dtype in INTEGER_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return values.astype(dtype)
+    return values
+
+
+def compact(frame: pd.DataFrame, categorical=(), integer=()) -> pd.DataFrame:
+    """``frame`` with ``categorical`` columns dictionary-encoded and ``integer`` columns downcast."""
+    columns = {column: dictionary(column).encode(frame[column]) for column in categorical}
+    columns.update({column: downcast_integers(frame[column]) for column in integer})
+    return frame.assign(**columns)
@@ -0,0 +1,161 @@
+"""Memory-mapped Arrow snapshots of the order lines and the rollup cube.
+
+Loading and aggregating the full order history before the first paint
+makes cold starts slow. A snapshot stores the order lines and the dense
+cells of the :class:`RollupCube` as uncompressed Arrow IPC files. Opening
+one memory-maps the files, so numeric columns and cube cells are views of
+the page cache rather than parsed copies, and the cube does not have to
+be rebuilt.
+
+Snapshots live in versioned directories under one root. A ``CURRENT``
+file names the live version; a background job writes a new snapshot
+(``python -m dashboard_core.snapshot``) and replaces ``CURRENT``
+atomically, and readers pick the new version up on their next load.
+"""
+
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from dashboard_core.cache import content_key
+from dashboard_core.cube import MEASURES, RollupCube
+from dashboard_core.engine import AggregationEngine
+from dashboard_core.store import load_order_lines
+
+# Environment variable naming the snapshot root; unset disables snapshots
+SNAPSHOT_ENV = "UF_SNAPSHOT_DIR"
+
+CURRENT = "CURRENT"
+ORDER_LINES_FILE = "order_lines.arrow"
+CUBE_FILE = "cube.arrow"
+
+# Snapshot versions kept on disk, the live one included
+KEEP_SNAPSHOTS = 2
+
+
+def snapshot_root() -> str | None:
+    """The snapshot root from :data:`SNAPSHOT_ENV`, or ``None``."""
+    return os.environ.get(SNAPSHOT_ENV) or None
+
+
+def _write_table(table: pa.Table, path: str):
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _map_table(path: str) -> pa.Table:
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def _cube_table(cube: RollupCube) -> pa.Table:
+    metadata = {
+        "dimensions": cube.dimensions,
+        "categories": {dimension: cube.categories[dimension].astype(str).tolist() for dimension in cube.dimensions},
+        "first_month": cube.first_month,
+        "shape": list(cube.shape),
+    }
+    columns = {measure: pa.array(np.ascontiguousarray(cube.cells[measure], dtype=float).ravel())
+               for measure in MEASURES}
+    return pa.table(columns).replace_schema_metadata({"cube": json.dumps(metadata)})
+
+
+def _cube_from_table(table: pa.Table) -> RollupCube:
+    metadata = json.loads(table.schema.metadata[b"cube"])
+    cube = RollupCube(metadata["dimensions"])
+    cube.categories = {dimension: pd.Index(values, dtype=object)
+                       for dimension, values in metadata["categories"].items()}
+    cube.first_month = metadata["first_month"]
+    shape = tuple(metadata["shape"])
+    # Read-only views of the mapped file; RollupCube.append copies on first write
+    cube.cells = {measure: table.column(measure).to_numpy().reshape(shape) for measure in MEASURES}
+    return cube
+
+
+def current_version(root: str) -> str | None:
+    """Name of the live snapshot under ``root``, or ``None`` when there is none."""
+    try:
+        with open(os.path.join(root, CURRENT)) as handle:
+            return handle.read().strip() or None
+    except OSError:
+        return None
+
+
+def write_snapshot(root: str, order_lines: pd.DataFrame, cube: RollupCube | None = None) -> str:
+    """Write a snapshot, make it the live one and return its version.
+
+    The files are written to a staging directory that is renamed into
+    place before ``CURRENT`` is replaced, so readers only ever see
+    complete snapshots.
+    """
+    os.makedirs(root, exist_ok=True)
+    cube = cube or RollupCube.from_order_lines(order_lines)
+    version = f"{time.strftime('%Y%m%dT%H%M%S')}-{content_key('order_lines', order_lines)[:12]}"
+    staging = os.path.join(root, f".tmp-{uuid.uuid4().hex}")
+    os.makedirs(staging)
+    _write_table(pa.Table.from_pandas(order_lines, preserve_index=False), os.path.join(staging, ORDER_LINES_FILE))
+    _write_table(_cube_table(cube), os.path.join(staging, CUBE_FILE))
+    os.rename(staging, os.path.join(root, version))
+
+    pointer = os.path.join(root, f".{CURRENT}-{uuid.uuid4().hex}")
+    with open(pointer, "w") as handle:
+        handle.write(version)
+    os.replace(pointer, os.path.join(root, CURRENT))
+    _prune(root, version)
+    return version
+
+
+def _prune(root: str, live: str):
+    versions = sorted(entry.name for entry in os.scandir(root)
+                      if entry.is_dir() and not entry.name.startswith("."))
+    stale = [version for version in versions if version != live][:max(len(versions) - KEEP_SNAPSHOTS, 0)]
+    for version in stale:
+        # Processes that still map these files keep them until they let go
+        shutil.rmtree(os.path.join(root, version), ignore_errors=True)
+
+
+def read_snapshot(root: str, version: str | None = None) -> tuple[pd.DataFrame, RollupCube, str] | None:
+    """Order lines, cube and version of a snapshot (the live one by default), memory-mapped."""
+    version = version or current_version(root)
+    if version is None:
+        return None
+    directory = os.path.join(root, version)
+    try:
+        order_lines = _map_table(os.path.join(directory, ORDER_LINES_FILE)).to_pandas(split_blocks=True)
+        cube = _cube_from_table(_map_table(os.path.join(directory, CUBE_FILE)))
+    except (OSError, pa.ArrowException):
+        return None
+    return order_lines, cube, version
+
+
+def open_engine(root: str | None = None, **engine_kwargs) -> AggregationEngine:
+    """Engine over the live snapshot under ``root``.
+
+    When ``root`` holds no snapshot yet, the order lines are loaded and
+    aggregated as usual and written as the first one. Without a root the
+    engine is built from :func:`load_order_lines` alone.
+    """
+    root = root or snapshot_root()
+    if root is None:
+        return AggregationEngine(load_order_lines(), **engine_kwargs)
+    snapshot = read_snapshot(root)
+    if snapshot is None:
+        order_lines = load_order_lines()
+        cube = RollupCube.from_order_lines(order_lines)
+        version = write_snapshot(root, order_lines, cube)
+    else:
+        order_lines, cube, version = snapshot
+    return AggregationEngine(order_lines, cube=cube, version=version, **engine_kwargs)
+
+
+if __name__ == "__main__":
+    # Background job: rebuild from UF_SALES_DATA and swap the live snapshot
+    target = snapshot_root()
+    if target is None:
+        raise SystemExit(f"Set {SNAPSHOT_ENV} to the snapshot directory")
+    print(write_snapshot(target, load_order_lines()))
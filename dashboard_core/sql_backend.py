@@ -0,0 +1,334 @@
+"""SQL query backend for the dashboard filters.
+
+:class:`SQLBackend` answers the same ``options``, ``summary`` and
+``order_view`` calls as :class:`AggregationEngine`, but pushes the
+group-bys down into a database instead of loading the order lines into
+the process. Connections come from a per-worker :class:`ConnectionPool`,
+so a filter change borrows an open connection rather than opening one.
+The SQL text depends only on the filter *shape* (which dimensions are
+filtered, with how many values, over how many date intervals); values
+are bound as parameters, so each shape is compiled once per connection
+and reused (SQLite keeps compiled statements in the connection's
+statement cache, keyed by their text). Results are read as Arrow record
+batches.
+
+SQLite (standard library) and DuckDB (optional) are supported; a
+``.duckdb`` path selects DuckDB.
+"""
+
+import functools
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+import pandas as pd
+import pyarrow as pa
+
+from dashboard_core.aggregations import KPI_NAMES, kpi_deltas, month_labels
+from dashboard_core.engine import SELECT_ALL, FilterKey
+from dashboard_core.periods import PREVIOUS_PERIOD, comparison_window
+from dashboard_core.store import DIMENSIONS, load_order_lines
+
+# Environment variable naming the database file; unset keeps the in-process engine
+SALES_DB_ENV = "UF_SALES_DB"
+
+SQLITE = "sqlite"
+DUCKDB = "duckdb"
+
+TABLE = "order_lines"
+
+# Rows per Arrow record batch read from a cursor
+BATCH_ROWS = 65536
+
+# Connections kept per worker process
+POOL_SIZE = 4
+
+# SQL for the month label and the start of each GRAINS bucket, per dialect
+TIME_SQL = {
+    SQLITE: {
+        "month": "strftime('%Y-%m', order_ts)",
+        "M": "strftime('%Y-%m-01', order_ts)",
+        "D": "date(order_ts)",
+        "h": "strftime('%Y-%m-%d %H:00:00', order_ts)",
+    },
+    DUCKDB: {
+        "month": "strftime(order_ts, '%Y-%m')",
+        "M": "date_trunc('month', order_ts)",
+        "D": "date_trunc('day', order_ts)",
+        "h": "date_trunc('hour', order_ts)",
+    },
+}
+
+KPI_SQL = (
+    "SELECT COALESCE(SUM(sales), 0) AS total_sales, COUNT(DISTINCT order_id) AS orders, "
+    "COUNT(DISTINCT customer_id) AS customers, COALESCE(SUM(quantity), 0) AS bottles "
+    "FROM {table}{where}"
+)
+SALES_BY_SQL = (
+    "SELECT {dimension}, SUM(sales) AS \"Sales\", COUNT(*) AS \"Count\" "
+    "FROM {table}{where} GROUP BY {dimension} ORDER BY \"Sales\" DESC"
+)
+MONTHLY_SALES_BY_SQL = (
+    "SELECT {month} AS month, {dimension}, SUM(sales) AS sales "
+    "FROM {table}{where} GROUP BY 1, 2"
+)
+ORDER_VIEW_SQL = (
+    "SELECT {bucket} AS period, SUM(sales) AS sales, COUNT(DISTINCT order_id) AS orders, "
+    "COUNT(DISTINCT customer_id) AS customers FROM {table}{where} GROUP BY 1 ORDER BY 1"
+)
+OPTIONS_SQL = "SELECT DISTINCT {dimension} FROM {table} ORDER BY 1"
+
+
+def sales_db() -> str | None:
+    """The database path from :data:`SALES_DB_ENV`, or ``None``."""
+    return os.environ.get(SALES_DB_ENV) or None
+
+
+def dialect_of(path: str) -> str:
+    return DUCKDB if path.endswith(".duckdb") else SQLITE
+
+
+def _check_dimension(dimension: str):
+    # Dimension names are spliced into the SQL text, so only known ones pass
+    if dimension not in DIMENSIONS:
+        raise ValueError(f"Unknown dimension: {dimension!r}")
+
+
+def filter_shape(key: FilterKey) -> tuple:
+    """Values per filtered dimension (0 when unfiltered) and the date interval count.
+
+    The count is ``None`` without a date filter; 0 is an empty window.
+    """
+    dates = None if key.dates is None else len(key.dates)
+    return tuple(len(getattr(key, dimension) or ()) for dimension in DIMENSIONS) + (dates,)
+
+
+def filter_params(key: FilterKey) -> list:
+    """Parameters of ``key`` in the order :func:`statement` places their markers."""
+    params = [value for dimension in DIMENSIONS for value in getattr(key, dimension) or ()]
+    for start, end in key.dates or ():
+        # ISO text compares correctly with both SQLite text and DuckDB timestamps
+        params += [start.isoformat(), end.isoformat()]
+    return params
+
+
+@functools.lru_cache(maxsize=256)
+def statement(template: str, dialect: str, shape: tuple, dimension: str | None = None,
+              grain: str | None = None) -> str:
+    """SQL text of ``template`` for one filter shape, with ``?`` markers for the values."""
+    conditions = [f"{name} IN ({', '.join('?' * count)})"
+                  for name, count in zip(DIMENSIONS, shape) if count]
+    if shape[-1] == 0:
+        conditions.append("1 = 0")
+    elif shape[-1]:
+        conditions.append("(" + " OR ".join(["(order_ts >= ? AND order_ts < ?)"] * shape[-1]) + ")")
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    times = TIME_SQL[dialect]
+    return template.format(table=TABLE, where=where, dimension=dimension,
+                           month=times["month"], bucket=times.get(grain))
+
+
+class ConnectionPool:
+    """A fixed number of connections shared by the sessions of one worker process.
+
+    Connections are opened on first use and handed back after each query;
+    callers beyond ``size`` wait for one to be returned.
+    """
+
+    def __init__(self, connect: Callable, size: int = POOL_SIZE):
+        self._connect = connect
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self):
+        with self._slots:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                connection = self._connect()
+            try:
+                yield connection
+            finally:
+                self._idle.put(connection)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def _sqlite_reader(cursor: sqlite3.Cursor, batch_rows: int) -> pa.RecordBatchReader:
+    """Arrow reader over a SQLite cursor; the first batch fixes the schema."""
+    names = [column[0] for column in cursor.description]
+    rows = cursor.fetchmany(batch_rows)
+    first = pa.RecordBatch.from_arrays([pa.array(column) for column in zip(*rows)] if rows
+                                       else [pa.nulls(0)] * len(names), names=names)
+
+    def batches():
+        yield first
+        while rows := cursor.fetchmany(batch_rows):
+            yield pa.RecordBatch.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(zip(*rows), first.schema)],
+                schema=first.schema,
+            )
+
+    return pa.RecordBatchReader.from_batches(first.schema, batches())
+
+
+def _view(frame: pd.DataFrame) -> pd.DataFrame:
+    frame["avg_order_value"] = frame["sales"] / frame["orders"]
+    frame["avg_sales_per_customer"] = frame["sales"] / frame["customers"]
+    return frame
+
+
+class SQLBackend:
+    """Dashboard aggregates computed by a database over pooled connections."""
+
+    def __init__(self, pool: ConnectionPool, dialect: str = SQLITE, batch_rows: int = BATCH_ROWS):
+        self.pool = pool
+        self.dialect = dialect
+        self.batch_rows = batch_rows
+
+    def _reader(self, connection, sql: str, params) -> pa.RecordBatchReader:
+        if self.dialect == DUCKDB:
+            return connection.execute(sql, params).fetch_record_batch(self.batch_rows)
+        return _sqlite_reader(connection.execute(sql, params), self.batch_rows)
+
+    def record_batches(self, sql: str, params=()) -> Iterator[pa.RecordBatch]:
+        """Stream the result of ``sql`` as Arrow record batches.
+
+        The connection stays borrowed until the iterator is exhausted or closed.
+        """
+        with self.pool.connection() as connection:
+            yield from self._reader(connection, sql, params)
+
+    def query(self, sql: str, params=()) -> pd.DataFrame:
+        with self.pool.connection() as connection:
+            return self._reader(connection, sql, params).read_all().to_pandas()
+
+    def _query(self, template: str, key: FilterKey, dimension: str | None = None,
+               grain: str | None = None) -> pd.DataFrame:
+        sql = statement(template, self.dialect, filter_shape(key), dimension, grain)
+        return self.query(sql, filter_params(key))
+
+    def options(self, dimension: str) -> list:
+        """Multiselect options for ``dimension``, led by "Select All"."""
+        _check_dimension(dimension)
+        values = self.query(OPTIONS_SQL.format(table=TABLE, dimension=dimension))[dimension]
+        return [SELECT_ALL] + values.dropna().astype(str).tolist()
+
+    def kpis(self, key: FilterKey) -> dict:
+        """Headline numbers shown on the KPI cards."""
+        row = self._query(KPI_SQL, key).iloc[0]
+        total_sales, orders, customers = float(row["total_sales"]), int(row["orders"]), int(row["customers"])
+        kpis = {
+            "total_sales": total_sales,
+            "avg_sales_per_customer": total_sales / customers if customers else 0.0,
+            "avg_sales_per_order": total_sales / orders if orders else 0.0,
+            "orders": orders,
+            "bottles": int(row["bottles"]),
+            "customers": customers,
+        }
+        return {name: kpis[name] for name in KPI_NAMES}
+
+    def sales_by(self, dimension: str, key: FilterKey) -> pd.DataFrame:
+        """Sales and line count per value of ``dimension``, largest first."""
+        _check_dimension(dimension)
+        frame = self._query(SALES_BY_SQL, key, dimension).set_index(dimension)
+        return frame.astype({"Sales": float, "Count": "int64"})
+
+    def monthly_sales_by(self, dimension: str, key: FilterKey) -> pd.DataFrame:
+        """Month x ``dimension`` sales pivot, one column per category."""
+        _check_dimension(dimension)
+        frame = self._query(MONTHLY_SALES_BY_SQL, key, dimension)
+        pivot = frame.pivot(index="month", columns=dimension, values="sales").fillna(0.0).sort_index()
+        pivot.index.name = None
+        pivot.columns = pivot.columns.astype(str)
+        pivot.columns.name = None
+        return pivot
+
+    def summary(self, key: FilterKey, comparison: str = PREVIOUS_PERIOD) -> dict:
+        """KPI and chart aggregates for ``key``, shaped like :meth:`AggregationEngine.summary`."""
+        kpis = self.kpis(key)
+        if key.dates is not None:
+            deltas = kpi_deltas(kpis, self.kpis(key._replace(dates=comparison_window(key.dates, comparison))))
+        else:
+            deltas = dict.fromkeys(KPI_NAMES)
+        monthly = self.order_view(key, "M")
+        monthly.index = month_labels(monthly.index.to_series())
+        return {
+            "kpis": kpis,
+            "kpi_deltas": deltas,
+            "order_view": monthly,
+            "customer_sales": self.sales_by("customer_category", key),
+            "customer_monthly": self.monthly_sales_by("customer_category", key),
+            "product_sales": self.sales_by("product_category", key),
+            "product_monthly": self.monthly_sales_by("product_category", key),
+        }
+
+    def order_view(self, key: FilterKey, grain: str = "D") -> pd.DataFrame:
+        """Orders, customers and averages per month ("M"), day ("D") or hour ("h") for ``key``."""
+        if grain not in TIME_SQL[self.dialect]:
+            raise ValueError(f"Unknown grain: {grain!r}")
+        frame = self._query(ORDER_VIEW_SQL, key, grain=grain)
+        frame = frame.set_index(pd.DatetimeIndex(pd.to_datetime(frame.pop("period")), name="period"))
+        return _view(frame.astype({"sales": float, "orders": "int64", "customers": "int64"}))
+
+    def close(self):
+        self.pool.close()
+
+
+def open_backend(path: str | None = None, pool_size: int = POOL_SIZE) -> SQLBackend:
+    """Backend over the database file at ``path`` (default :data:`SALES_DB_ENV`)."""
+    path = path or sales_db()
+    if path is None:
+        raise ValueError(f"Set {SALES_DB_ENV} to the sales database")
+    dialect = dialect_of(path)
+    if dialect == DUCKDB:
+        import duckdb
+
+        # Cursors are separate connections to the one database instance
+        connect = duckdb.connect(path, read_only=True).cursor
+    else:
+        connect = functools.partial(sqlite3.connect, path, check_same_thread=False)
+    return SQLBackend(ConnectionPool(connect, pool_size), dialect)
+
+
+def write_order_lines(path: str, order_lines: pd.DataFrame):
+    """Replace the order-line table of the database at ``path``, for local testing."""
+    table = pa.Table.from_pandas(order_lines.astype({dimension: str for dimension in DIMENSIONS}),
+                                 preserve_index=False)
+    if dialect_of(path) == DUCKDB:
+        import duckdb
+
+        with duckdb.connect(path) as connection:
+            connection.register("incoming", table)
+            connection.execute(f"CREATE OR REPLACE TABLE {TABLE} AS SELECT * FROM incoming")
+            connection.execute(f"CREATE INDEX IF NOT EXISTS {TABLE}_order_ts ON {TABLE} (order_ts)")
+        return
+    timestamps = order_lines["order_ts"].dt.strftime("%Y-%m-%d %H:%M:%S.%f")
+    rows = zip(*(timestamps if name == "order_ts" else column.to_pylist()
+                 for name, column in zip(table.column_names, table.columns)))
+    with sqlite3.connect(path) as connection:
+        connection.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        connection.execute(
+            f"CREATE TABLE {TABLE} (order_id INTEGER, order_ts TEXT, customer_id INTEGER, "
+            "customer_category TEXT, warehouse TEXT, product_category TEXT, quantity INTEGER, sales REAL)"
+        )
+        connection.executemany(f"INSERT INTO {TABLE} VALUES ({', '.join('?' * len(table.column_names))})", rows)
+        connection.execute(f"CREATE INDEX {TABLE}_order_ts ON {TABLE} (order_ts)")
+
+
+if __name__ == "__main__":
+    # Local testing: load UF_SALES_DATA (or the sample) into UF_SALES_DB
+    target = sales_db()
+    if target is None:
+        raise SystemExit(f"Set {SALES_DB_ENV} to the database file")
+    write_order_lines(target, load_order_lines())
+    print(target)
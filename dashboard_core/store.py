@@ -0,0 +1,165 @@
+"""Columnar order-line store behind the UF sales dashboard.
+
+Order lines are held as one pandas DataFrame with typed columns: integer
+ids, a ``datetime64`` timestamp, float sales and dictionary-encoded
+(categorical) dimensions. Real data is read from Parquet; when no file is
+configured a deterministic sample is generated so the dashboard still
+renders.
+"""
+
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from dashboard_core.dates import parse_timestamps
+from dashboard_core.schema import downcast_integers
+
+# Environment variable pointing at a Parquet file (or directory of files)
+SALES_DATA_ENV = "UF_SALES_DATA"
+
+CUSTOMER_CATEGORIES = ["Retail", "Trade", "Warehouse", "Distributor", "Online", "B2B", "B2C"]
+
+WAREHOUSES = [
+    "Main Warehouse",
+    "North Warehouse",
+    "South Warehouse",
+    "East Warehouse",
+    "West Warehouse",
+    "Central Hub",
+    "Distribution Center A",
+    "Distribution Center B",
+]
+
+PRODUCT_CATEGORIES = [
+    "Uncategorized",
+    "Liquor & Spirits",
+    "Wine",
+    "Service",
+    "Beer",
+    "Low Alcohol",
+    "POSM",
+    "Tea",
+    "Cordials, Syrups & Squash",
+    "Non-Alcoholic",
+    "Accessories",
+    "Supplement",
+    "Barware",
+]
+
+# Dimension columns stored dictionary-encoded
+DIMENSIONS = ["customer_category", "warehouse", "product_category"]
+
+# Category recorded for order lines with no dimension value
+EMPTY_CATEGORY = "(empty)"
+
+ORDER_LINE_SCHEMA = {
+    "order_id": "int64",
+    "order_ts": "datetime64[ns]",
+    "customer_id": "int32",
+    "customer_category": "category",
+    "warehouse": "category",
+    "product_category": "category",
+    "quantity": "int32",
+    "sales": "float64",
+}
+
+
+def coerce_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast ``df`` to the order-line schema and sort it by timestamp."""
+    missing = set(ORDER_LINE_SCHEMA) - set(df.columns)
+    if missing:
+        raise ValueError(f"Order lines are missing columns: {sorted(missing)}")
+
+    df = df[list(ORDER_LINE_SCHEMA)]
+    if df["order_ts"].dtype.kind != "M":
+        # Text timestamps from exports are parsed once per distinct value
+        df = df.assign(order_ts=parse_timestamps(df["order_ts"]))
+    df = df.astype(ORDER_LINE_SCHEMA)
+    df["quantity"] = downcast_integers(df["quantity"])
+    for dimension in DIMENSIONS:
+        if df[dimension].isna().any():
+            column = df[dimension]
+            if EMPTY_CATEGORY not in column.cat.categories:
+                column = column.cat.add_categories([EMPTY_CATEGORY])
+            df[dimension] = column.fillna(EMPTY_CATEGORY)
+    df = df.sort_values("order_ts", kind="stable", ignore_index=True)
+    return df
+
+
+def append_order_lines(order_lines: pd.DataFrame, new_lines: pd.DataFrame) -> pd.DataFrame:
+    """Concatenate new order lines onto the store, keeping category codes stable."""
+    new_lines = coerce_schema(new_lines)
+    order_lines = order_lines.copy(deep=False)
+    for dimension in DIMENSIONS:
+        known = order_lines[dimension].cat.categories
+        added = new_lines[dimension].cat.categories.difference(known, sort=False)
+        categories = known.append(added)
+        order_lines[dimension] = order_lines[dimension].cat.add_categories(added)
+        new_lines[dimension] = new_lines[dimension].cat.set_categories(categories)
+
+    combined = pd.concat([order_lines, new_lines], ignore_index=True)
+    if len(order_lines) and len(new_lines) and new_lines["order_ts"].iloc[0] < order_lines["order_ts"].iloc[-1]:
+        combined = combined.sort_values("order_ts", kind="stable", ignore_index=True)
+    return combined
+
+
+def load_order_lines(path: str | None = None) -> pd.DataFrame:
+    """Load order lines from Parquet, or build the sample data set."""
+    path = path or os.environ.get(SALES_DATA_ENV)
+    if not path:
+        return sample_order_lines()
+    df = pd.read_parquet(path, columns=list(ORDER_LINE_SCHEMA))
+    return coerce_schema(df)
+
+
+def sample_order_lines(
+    n_orders: int = 2200,
+    n_customers: int = 1000,
+    months: int = 21,
+    end: date | None = None,
+    seed: int = 42,
+) -> pd.DataFrame:
+    """Generate deterministic order lines covering ``months`` months up to ``end``."""
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or date.today()).normalize() + pd.Timedelta(days=1)
+    start = (end - pd.DateOffset(months=months - 1)).to_period("M").to_timestamp()
+
+    # One category per customer, weighted towards Trade and Retail
+    customer_weights = np.array([0.35, 0.55, 0.03, 0.03, 0.02, 0.01, 0.01])
+    customer_category = rng.choice(
+        len(CUSTOMER_CATEGORIES), size=n_customers, p=customer_weights
+    )
+
+    # Orders spread uniformly over the window, each with 1-5 lines
+    span_ns = (end - start).value
+    order_ts = np.sort(start.value + rng.integers(0, span_ns, size=n_orders))
+    order_customer = rng.integers(0, n_customers, size=n_orders)
+    order_warehouse = rng.integers(0, len(WAREHOUSES), size=n_orders)
+    lines_per_order = rng.integers(1, 6, size=n_orders)
+    line_order = np.repeat(np.arange(n_orders), lines_per_order)
+
+    product_weights = np.array(
+        [0.45, 0.12, 0.10, 0.06, 0.06, 0.03, 0.04, 0.03, 0.03, 0.02, 0.03, 0.02, 0.01]
+    )
+    unit_prices = np.array(
+        [45.0, 95.0, 60.0, 180.0, 8.0, 12.0, 5.0, 20.0, 15.0, 6.0, 25.0, 30.0, 18.0]
+    )
+    product = rng.choice(len(PRODUCT_CATEGORIES), size=len(line_order), p=product_weights)
+    quantity = rng.integers(1, 7, size=len(line_order))
+    price = unit_prices[product] * rng.uniform(0.8, 1.2, size=len(line_order))
+
+    df = pd.DataFrame({
+        "order_id": line_order + 1,
+        "order_ts": pd.to_datetime(order_ts[line_order]),
+        "customer_id": order_customer[line_order],
+        "customer_category": pd.Categorical.from_codes(
+            customer_category[order_customer[line_order]], CUSTOMER_CATEGORIES
+        ),
+        "warehouse": pd.Categorical.from_codes(order_warehouse[line_order], WAREHOUSES),
+        "product_category": pd.Categorical.from_codes(product, PRODUCT_CATEGORIES),
+        "quantity": quantity,
+        "sales": np.round(quantity * price, 2),
+    })
+    return coerce_schema(df)
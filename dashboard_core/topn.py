@@ -0,0 +1,113 @@
+"""Top-N selection with the remainder folded into an exact "Other" row.
+
+:func:`top_n` picks the K largest entries with ``np.argpartition`` (linear
+time) and sorts only those K, instead of sorting every entity.
+:class:`RunningTopK` keeps the same answer current while totals grow: a
+min-heap of the current top K is checked against each updated entity,
+so an update costs ``O(log K)`` per changed entity rather than a rescan.
+"""
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+
+def other_label(label: str, hidden: int, show_count: bool = True) -> str:
+    """``"Other (N more)"`` style label for ``hidden`` folded entities."""
+    return f"{label} ({hidden} more)" if show_count else label
+
+
+def top_n(values: pd.Series | pd.DataFrame, keep: int, by: str | None = None, label: str = "Other",
+          show_count: bool = True) -> pd.Series | pd.DataFrame:
+    """The ``keep`` largest entries, largest first, plus one row summing the rest.
+
+    For a frame, ``by`` names the ranking column and every numeric column
+    is summed into the remainder row.
+    """
+    ranking = values[by] if by is not None else values
+    if len(values) <= keep:
+        return values.iloc[np.argsort(-ranking.to_numpy(), kind="stable")]
+
+    scores = ranking.to_numpy()
+    top = np.argpartition(-scores, keep - 1)[:keep]
+    top = top[np.argsort(-scores[top], kind="stable")]
+    rest = np.ones(len(values), dtype=bool)
+    rest[top] = False
+
+    head = values.iloc[top]
+    name = other_label(label, len(values) - keep, show_count)
+    if isinstance(values, pd.DataFrame):
+        remainder = values.iloc[rest].sum(numeric_only=True).to_frame(name).T
+        return pd.concat([head, remainder.astype(head.dtypes[remainder.columns].to_dict())])
+    return pd.concat([head, pd.Series({name: scores[rest].sum()}, name=values.name)])
+
+
+class RunningTopK:
+    """Top ``k`` entities by a running total that only grows.
+
+    ``update`` adds non-negative increments. A decrement to a current
+    member falls back to a rebuild of the heap from the totals. When
+    ``key`` and ``value`` columns are given, :meth:`fold` accepts order
+    lines, so the tracker can be used as a refresh feed consumer.
+    """
+
+    def __init__(self, k: int, key: str | None = None, value: str | None = None):
+        self.k = k
+        self.key = key
+        self.value = value
+        self.totals = {}
+        self.grand_total = 0.0
+        self.members = set()
+        # Min-heap of (total, entity); entries whose total is outdated are skipped
+        self._heap = []
+
+    def _pop_stale(self):
+        heap = self._heap
+        while heap and (heap[0][1] not in self.members or heap[0][0] != self.totals[heap[0][1]]):
+            heapq.heappop(heap)
+
+    def _rebuild(self):
+        keys = list(self.totals)
+        scores = np.fromiter(self.totals.values(), dtype=float, count=len(keys))
+        top = np.argpartition(-scores, min(self.k, len(keys)) - 1)[:self.k] if len(keys) > self.k else range(len(keys))
+        self.members = {keys[i] for i in top}
+        self._heap = [(self.totals[key], key) for key in self.members]
+        heapq.heapify(self._heap)
+
+    def update(self, keys, increments):
+        """Add ``increments`` to the totals of ``keys``."""
+        rebuild = False
+        for key, increment in zip(keys, increments):
+            increment = float(increment)
+            total = self.totals.get(key, 0.0) + increment
+            self.totals[key] = total
+            self.grand_total += increment
+            if key in self.members:
+                rebuild |= increment < 0
+                heapq.heappush(self._heap, (total, key))
+            elif len(self.members) < self.k:
+                self.members.add(key)
+                heapq.heappush(self._heap, (total, key))
+            else:
+                self._pop_stale()
+                if total > self._heap[0][0]:
+                    self.members.discard(heapq.heappop(self._heap)[1])
+                    self.members.add(key)
+                    heapq.heappush(self._heap, (total, key))
+        if rebuild or len(self._heap) > 4 * self.k + 64:
+            self._rebuild()
+
+    def fold(self, lines: pd.DataFrame):
+        """Add order lines, summing ``value`` per ``key``."""
+        partial = lines.groupby(self.key, sort=False, observed=True)[self.value].sum()
+        self.update(partial.index, partial.to_numpy())
+
+    def result(self, label: str = "Other", show_count: bool = True) -> pd.Series:
+        """Current top ``k`` totals, largest first, plus the exact remainder."""
+        top = sorted(((self.totals[key], key) for key in self.members), reverse=True)
+        result = pd.Series({key: total for total, key in top}, dtype=float)
+        hidden = len(self.totals) - len(self.members)
+        if hidden:
+            result[other_label(label, hidden, show_count)] = self.grand_total - result.sum()
+        return result
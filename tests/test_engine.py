@@ -0,0 +1,46 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard_core import (
+    AggregationEngine,
+    make_filter_key,
+    monthly_sales_by,
+    resolve_date_ranges,
+    sample_order_lines,
+)
+
+TODAY = date(2025, 6, 18)
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return AggregationEngine(sample_order_lines(n_orders=3000, seed=11, end=TODAY))
+
+
+@pytest.mark.parametrize("dates", [["Past 90 days"], ["Past 30 days", "Yesterday"], ["Past 7 days"]])
+@pytest.mark.parametrize("customer_category", [None, ["B2B"], ["Retail", "Online"]])
+def test_monthly_breakdown_matches_rows(engine, dates, customer_category):
+    key = make_filter_key(customer_category=customer_category, dates=resolve_date_ranges(dates, today=TODAY))
+    rows = engine.rows(key)
+    for dimension, name in (("customer_category", "customer"), ("product_category", "product")):
+        expected = monthly_sales_by(rows, dimension)
+        actual = engine.summary(key)[f"{name}_monthly"]
+        assert not actual.isna().any().any()
+        actual = actual.loc[:, actual.sum() > 0]
+        pd.testing.assert_frame_equal(
+            actual.sort_index(axis=1), expected.sort_index(axis=1),
+            check_dtype=False, check_index_type=False, check_column_type=False, check_names=False,
+        )
+        assert np.isclose(actual.to_numpy().sum(), rows["sales"].sum())
+
+
+def test_masks_stay_within_byte_budget():
+    order_lines = sample_order_lines(n_orders=3000, seed=11, end=TODAY)
+    budget = 4 * len(order_lines)
+    engine = AggregationEngine(order_lines, max_bytes=budget)
+    for category in engine.options("customer_category")[1:]:
+        engine.mask(make_filter_key(customer_category=[category]))
+    assert 0 < engine._masks.nbytes <= budget
@@ -0,0 +1,29 @@
+import pandas as pd
+import pytest
+
+from dashboard_core import figures
+
+
+def annotations(fig):
+    return [annotation.text for annotation in fig.layout.annotations]
+
+
+@pytest.mark.parametrize("build", [
+    lambda: figures.stacked_bar(pd.DataFrame({"month": pd.PeriodIndex([], freq="M"), "segment": [], "sales": []}),
+                                x="month", y="sales", color="segment", color_map={}),
+    lambda: figures.labeled_bar(pd.DataFrame({"Item": [], "Quantity": []}), x="Item", y="Quantity", color_map={}),
+    lambda: figures.horizontal_bar(pd.DataFrame({"customer": [], "Quantity": []}), x="Quantity", y="customer",
+                                   color="#836ab5"),
+    lambda: figures.donut(["A", "B"], [0, 0], ["#000000", "#ffffff"], "0<br>TOTAL"),
+    lambda: figures.donut([], [], [], "Total"),
+])
+def test_empty_data_gives_empty_state(build):
+    fig = build()
+    assert not fig.data
+    assert annotations(fig) == [figures.EMPTY_MESSAGE]
+
+
+def test_horizontal_bar_single_row():
+    fig = figures.horizontal_bar(pd.DataFrame({"customer": ["A"], "Quantity": [3]}), x="Quantity", y="customer",
+                                 color="#836ab5")
+    assert fig.data[0].marker.color == "#836ab5"
@@ -0,0 +1,17 @@
+from datetime import date, timedelta
+
+from dashboard_core import loca_loka
+
+IRONHILL = loca_loka.order_filters(ironhill="Yes")
+
+
+def test_filtered_feed_counts_only_matching_customers():
+    # customer is categorical; unobserved outlets must not appear as groups
+    baseline = loca_loka.load_kpis_as_of(date.today() - timedelta(days=loca_loka.DELTA_DAYS), IRONHILL)
+    assert baseline["customers"] == 1
+
+    feed = loca_loka.get_order_feed(IRONHILL)
+    feed.refresh(force=True)
+    assert loca_loka.top_customers(feed)["customer"].tolist() == ["Ironhill Hospitality Pte Ltd"]
+    bottles = feed.consumers["depletion"].bottles
+    assert bottles.index.unique(level="customer").tolist() == ["Ironhill Hospitality Pte Ltd"]
@@ -0,0 +1,17 @@
+import pytest
+from streamlit.testing.v1 import AppTest
+
+SINGAPORE_PAGE = "../Pages/Loca_Loka_Sales_inSingapore.py"
+
+
+@pytest.mark.parametrize("selections", [
+    {"Status": "Pending", "Ironhill Toggle": "Yes"},
+    {"Status": "Pending", "Item": "Loca Loka Reposado", "Customer Category": "Retail"},
+])
+def test_singapore_filters_without_matching_lines(selections):
+    app = AppTest.from_file(SINGAPORE_PAGE, default_timeout=120).run()
+    for label, value in selections.items():
+        next(box for box in app.selectbox if box.label == label).set_value(value)
+    app.run()
+    assert not app.exception
+    assert [metric.value for metric in app.metric][:4] == ["0", "0", "0", "0"]
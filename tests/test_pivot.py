@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard_core import SparsePivot
+
+
+def lines(customers, timestamps, quantities):
+    return pd.DataFrame({
+        "order_id": np.arange(len(customers)),
+        "order_ts": pd.to_datetime(timestamps),
+        "customer": customers,
+        "quantity": quantities,
+    })
+
+
+def test_empty_window_then_slide():
+    pivot = SparsePivot("customer", "quantity")
+    pivot.fold(lines(["Pullman"], ["2024-03-05"], [4]))
+    frame, active = pivot.page(end=pd.Timestamp("2026-09-18"))
+    assert active == 0 and frame.empty
+
+    pivot.fold(lines(["Pullman"], ["2026-10-02"], [3]))
+    frame, active = pivot.page(end=pd.Timestamp("2026-10-18"))
+    assert active == 1
+    assert frame["Total"].tolist() == [3]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_window_matches_groupby(seed):
+    rng = np.random.default_rng(seed)
+    pivot = SparsePivot("customer", "quantity")
+    folded = []
+    for _ in range(6):
+        n = int(rng.integers(0, 20))
+        batch = lines(
+            rng.choice(["A", "B", "C", "D"], size=n),
+            pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 1000, size=n), unit="D"),
+            rng.integers(1, 7, size=n),
+        )
+        pivot.fold(batch)
+        folded.append(batch)
+        end = pd.Timestamp("2024-01-01") + pd.Timedelta(days=int(rng.integers(0, 1100)))
+        frame, active = pivot.page(end=end, page_size=10)
+
+        history = pd.concat(folded)
+        first = end.to_period("M") - 11
+        window = history[history["order_ts"].dt.to_period("M").between(first, end.to_period("M"))]
+        expected = window.groupby("customer")["quantity"].sum()
+        assert active == len(expected)
+        assert dict(zip(frame["customer"], frame["Total"])) == expected.to_dict()